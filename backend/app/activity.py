@@ -0,0 +1,106 @@
+from datetime import datetime
+from sqlalchemy import func, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from . import models
+
+# Log aktivitas (append-only) + hitungan berjalan per user untuk halaman profil.
+# Profil cukup baca baris counter & beberapa event terakhir, tidak lagi scan tabel leads.
+
+# action -> (kolom counter yang ditambah lead_count, teks di "recent activity")
+ACTIONS = {
+    "lead_added": ("leads_added", "Added to database Nasabah-{lead_id}"),
+    "leads_imported": ("leads_added", "Imported {lead_count} leads from Nasabah-{lead_id}"),
+    "notes_updated": ("notes_updated", "Updated notes for Nasabah-{lead_id}"),
+}
+HIGH_LABEL = "High Potential"
+
+# Baris counter untuk aktivitas tanpa login (user_id NULL di activity_events)
+ANONYMOUS_USER = 0
+
+def bump_counters(db: Session, user_id, deltas: dict):
+    """UPSERT kolom = kolom + delta per user (tidak commit, ikut transaksi pemanggil)"""
+    table = models.UserActivityCounter.__table__
+    dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    stmt = dialect_insert(table).values(
+        user_id=ANONYMOUS_USER if user_id is None else user_id,
+        first_activity_at=func.now(), last_activity_at=func.now(), **deltas
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id"],
+        set_={
+            **{name: table.c[name] + stmt.excluded[name] for name in deltas},
+            "last_activity_at": stmt.excluded.last_activity_at,
+        }
+    )
+    db.execute(stmt)
+
+def record(db: Session, action: str, user_id=None, lead_id=None, lead_count: int = 1, high_potential: int = 0):
+    """Tambah satu event + update counter user-nya (tidak commit, dipanggil sebelum commit data lead)"""
+    counter, _ = ACTIONS[action]
+    db.execute(insert(models.ActivityEvent).values(user_id=user_id, action=action, lead_id=lead_id, lead_count=lead_count))
+    deltas = {counter: lead_count}
+    if high_potential:
+        deltas["high_potential_added"] = high_potential
+    bump_counters(db, user_id, deltas)
+
+def record_leads(db: Session, lead_ids: list, labels: list, user_id=None):
+    """Lead baru (satu lead dari form, atau satu chunk upload CSV = satu event)"""
+    if not lead_ids:
+        return
+    action = "lead_added" if len(lead_ids) == 1 else "leads_imported"
+    high = sum(1 for label in labels if label == HIGH_LABEL)
+    record(db, action, user_id, lead_id=lead_ids[0], lead_count=len(lead_ids), high_potential=high)
+
+def describe(event: models.ActivityEvent) -> dict:
+    _, template = ACTIONS[event.action]
+    return {
+        "lead_id": event.lead_id,
+        "time": event.created_at.strftime("%Y-%m-%d %H:%M"),
+        "content": template.format(lead_id=event.lead_id, lead_count=event.lead_count)
+    }
+
+def summary(db: Session, user_id=None) -> dict:
+    """Counter satu user, atau jumlah semua user kalau user_id None (satu baris per user)"""
+    C = models.UserActivityCounter
+    query = db.query(func.sum(C.leads_added), func.sum(C.high_potential_added), func.min(C.first_activity_at))
+    if user_id is not None:
+        query = query.filter(C.user_id == user_id)
+    leads_added, high_potential, first_activity_at = query.one()
+    return {
+        "leads_added": leads_added or 0,
+        "high_potential_added": high_potential or 0,
+        "first_activity_at": first_activity_at,
+    }
+
+def recent(db: Session, user_id=None, limit: int = 5) -> list:
+    """N event terakhir (primary key / index (user_id, id), tidak tergantung jumlah event)"""
+    E = models.ActivityEvent
+    query = db.query(E)
+    if user_id is not None:
+        query = query.filter(E.user_id == user_id)
+    return [describe(event) for event in query.order_by(E.id.desc()).limit(limit).all()]
+
+def active_days(first_activity_at) -> int:
+    if first_activity_at is None:
+        return 0
+    return (datetime.now(first_activity_at.tzinfo) - first_activity_at).days + 1
+
+def ensure_built(db: Session):
+    """Startup: DB lama punya leads tapi belum punya counter, isi sekali dari tabel leads (tanpa event)"""
+    if db.query(models.UserActivityCounter).first() is not None:
+        return
+    Lead = models.Lead
+    total, high, first_created = db.query(
+        func.count(Lead.id),
+        func.count(Lead.id).filter(Lead.prediction_label == HIGH_LABEL),
+        func.min(Lead.created_at)
+    ).one()
+    if not total:
+        return
+    db.add(models.UserActivityCounter(
+        user_id=ANONYMOUS_USER, leads_added=total, high_potential_added=high, notes_updated=0,
+        first_activity_at=first_created, last_activity_at=func.now()
+    ))
+    db.commit()
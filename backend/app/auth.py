@@ -1,9 +1,18 @@
 from datetime import datetime, timedelta
 from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import Depends, HTTPException
+from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from starlette.concurrency import run_in_threadpool
 from dotenv import load_dotenv
+import asyncio
 import os
+import time
+
+from . import schemas
+from .prediction_cache import PredictionCache
 
 # Load file .env
 load_dotenv()
@@ -13,7 +22,23 @@ SECRET_KEY = os.getenv("SECRET_KEY", "fallback-secret-key-untuk-dev")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 1440))
 
+# true: route lead, dashboard, upload & job wajib pakai token (Authorization: Bearer ...).
+# Route admin (reload/promote/shadow model, hapus cache, rebuild dashboard) selalu wajib token (main.ADMIN)
+AUTH_REQUIRED = os.getenv("AUTH_REQUIRED", "false").lower() == "true"
+# Cache token yang sudah diverifikasi -> user (tanpa decode JWT & query users tiap request).
+# TTL = paling lama perubahan user (mis. dinonaktifkan) belum terlihat oleh token yang sudah di-cache.
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 10000))
+TOKEN_CACHE_TTL = float(os.getenv("TOKEN_CACHE_TTL", 300))
+# bcrypt sengaja lambat (~200 ms), jadi dijalankan di thread pool sendiri, tidak memakai threadpool request
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+
+# auto_error=False: token kosong ditangani get_current_user (401 yang sama untuk semua kasus)
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/login", auto_error=False)
+# token -> (exp token (epoch), CurrentUser)
+token_cache = PredictionCache(TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL, name="tokens")
 
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
@@ -26,4 +51,68 @@ def create_access_token(data: dict):
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
\ No newline at end of file
+    return encoded_jwt
+
+async def verify_password_async(plain_password, hashed_password) -> bool:
+    return await asyncio.get_running_loop().run_in_executor(password_executor, verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password) -> str:
+    return await asyncio.get_running_loop().run_in_executor(password_executor, get_password_hash, password)
+
+def credentials_error() -> HTTPException:
+    return HTTPException(status_code=401, detail="Could not validate credentials", headers={"WWW-Authenticate": "Bearer"})
+
+def load_user(username: str) -> Optional[schemas.CurrentUser]:
+    from . import crud # crud meng-import auth
+    from .database import SessionLocal
+    db = SessionLocal()
+    try:
+        user = crud.get_user_by_username(db, username=username)
+        if user is None:
+            return None
+        return schemas.CurrentUser(id=user.id, username=user.username, is_active=user.is_active is not False)
+    finally:
+        db.close()
+
+async def get_current_user(token: Optional[str] = Depends(oauth2_scheme)) -> schemas.CurrentUser:
+    """
+    Dependency user yang sedang login. Token yang sudah pernah diverifikasi diambil dari cache
+    (satu lookup dict, langsung di event loop); hanya token baru yang di-decode dan dicek ke tabel users.
+    """
+    if not token:
+        raise credentials_error()
+
+    cached = token_cache.get_many([token])[0]
+    if cached is None:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError:
+            raise credentials_error()
+        username = payload.get("sub")
+        if username is None or "exp" not in payload:
+            raise credentials_error()
+        user = await run_in_threadpool(load_user, username)
+        if user is None or not user.is_active:
+            raise credentials_error()
+        cached = (payload["exp"], user)
+        token_cache.put_many([(token, cached)])
+
+    expires_at, user = cached
+    # Entry cache bisa lebih lama dari umur token, jadi exp tetap dicek tiap request
+    if expires_at <= time.time():
+        raise credentials_error()
+    return user
+
+if AUTH_REQUIRED:
+    async def get_current_user_id(user: schemas.CurrentUser = Depends(get_current_user)) -> Optional[int]:
+        """id user untuk activity log. get_current_user tidak dijalankan dua kali (dependency di-cache per request)"""
+        return user.id
+else:
+    async def get_current_user_id(token: Optional[str] = Depends(oauth2_scheme)) -> Optional[int]:
+        """Login opsional: token valid -> id user, tanpa token / token tidak valid -> None (aktivitas anonim)"""
+        if not token:
+            return None
+        try:
+            return (await get_current_user(token)).id
+        except HTTPException:
+            return None
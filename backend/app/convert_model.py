@@ -0,0 +1,53 @@
+"""
+Konversi model pickle (XGBClassifier sklearn wrapper) ke format native XGBoost (UBJSON/JSON).
+Cukup dijalankan sekali setiap ada model baru, hasilnya dipakai oleh ML_BACKEND=booster.
+
+Jalankan dari folder backend/:
+    python -m app.convert_model
+    python -m app.convert_model --input ml_assets/model_baru.pkl --output ml_assets/model_baru.json
+"""
+import argparse
+import json
+import os
+import pickle
+import numpy as np
+
+# Sama dengan default di ml_service.py (tidak di-import supaya model tidak ikut dimuat)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join(BASE_DIR, "../ml_assets/xgboost_tuned_v2.pkl")
+BOOSTER_PATH = os.path.join(BASE_DIR, "../ml_assets/xgboost_tuned_v2.ubj")
+FEATURES_PATH = os.path.join(BASE_DIR, "../ml_assets/model_features.json")
+
+def convert(input_path: str, output_path: str, features_path: str = FEATURES_PATH):
+    with open(input_path, 'rb') as f:
+        model = pickle.load(f)
+    booster = model.get_booster()
+
+    # Pastikan urutan fitur di model sama dengan model_features.json yang dipakai encoder
+    with open(features_path, 'r') as f:
+        expected_columns = json.load(f)
+    if booster.feature_names and list(booster.feature_names) != expected_columns:
+        raise ValueError("Feature names in model do not match model_features.json")
+
+    # Format ditentukan dari ekstensi file (.ubj = UBJSON, .json = JSON)
+    booster.save_model(output_path)
+
+    # Cek skor hasil konversi sama dengan model pickle
+    import xgboost as xgb
+    converted = xgb.Booster(model_file=output_path)
+    X = np.random.default_rng(0).random((256, len(expected_columns))).astype(np.float32)
+    if not np.array_equal(model.predict_proba(X)[:, 1], converted.inplace_predict(X)):
+        raise ValueError("Converted model scores differ from the pickle model")
+
+    print(f"✅ Model converted: {input_path} -> {output_path}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert pickled XGBClassifier to native XGBoost format")
+    parser.add_argument("--input", default=MODEL_PATH)
+    parser.add_argument("--output", default=BOOSTER_PATH)
+    parser.add_argument("--features", default=FEATURES_PATH)
+    args = parser.parse_args()
+    convert(args.input, args.output, args.features)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Jumlah proses untuk scoring XGBoost & SHAP (0 = dihitung di thread pemanggil, perilaku lama).
+# Cache prediksi tetap dicek di proses utama, yang dikirim ke pool hanya baris yang belum pernah diskor.
+CPU_POOL_WORKERS = int(os.getenv("CPU_POOL_WORKERS", 0))
+
+# --- Dijalankan di proses worker ---
+# Model yang sudah dimuat di worker ini, per nama model
+worker_models = {}
+# ML_LOAD_MODE=eager: explainer SHAP dibuat bersamaan dengan model, bukan saat explain pertama
+preload_explainer = False
+
+def init_worker(specs: list):
+    global preload_explainer
+    preload_explainer = os.getenv("ML_LOAD_MODE", "eager") == "eager"
+    # Worker tidak butuh ml_service global (registry watcher, shadow, dsb.), model dimuat sendiri per spec
+    os.environ["ML_LOAD_MODE"] = "background"
+    for spec in specs:
+        worker_model(*spec)
+
+def worker_model(name: str, entry: dict, model_version: str):
+    from .ml_service import LoadedModel
+    model = worker_models.get(name)
+    if model is None or model.model_version != model_version:
+        # Model baru / file-nya berubah (hot reload di proses utama): muat ulang
+        model = worker_models[name] = LoadedModel(name, entry).load()
+        if preload_explainer:
+            model.get_explainer()
+    return model
+
+def compute_scores(spec: tuple, X):
+    return worker_model(*spec).compute_scores(X)
+
+def compute_explanations(spec: tuple, X, top_k: int):
+    model = worker_model(*spec)
+    if not model.get_explainer():
+        return [None] * len(X)
+    return model.compute_explanations(X, top_k)
+
+# --- Dipakai di proses utama ---
+class CpuPool:
+    """
+    Process pool untuk kerja CPU (predict & SHAP), jadi thread request / ingest di proses
+    utama tidak berebut GIL dengan model. Proses dibuat dengan "spawn" (fork setelah
+    XGBoost/OpenMP jalan bisa deadlock), masing-masing memuat model sendiri.
+    """
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.executor = None
+        self.specs = [] # Model yang dimuat saat worker start (dipakai lagi kalau pool dibuat ulang)
+        self.lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    def start(self, specs: list = ()):
+        """Nyalakan semua proses worker sekarang (bukan saat request pertama) dan muat model di dalamnya"""
+        with self.lock:
+            if specs:
+                self.specs = list(specs)
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=init_worker,
+                    initargs=(self.specs,)
+                )
+                # Proses worker baru dibuat saat ada task yang menunggu, jadi kirim satu task kosong per worker
+                for _ in range(self.workers):
+                    self.executor.submit(os.getpid)
+        return self.executor
+
+    def run(self, fn, *args):
+        """Jalankan fn(*args) di salah satu proses worker dan tunggu hasilnya (blocking, GIL dilepas selama menunggu)"""
+        executor = self.start()
+        try:
+            return executor.submit(fn, *args).result()
+        except BrokenProcessPool:
+            # Satu worker mati (OOM, crash di xgboost): executor-nya rusak permanen, jadi dibuang,
+            # pool dibuat ulang dan task dicoba sekali lagi
+            print("⚠️ CPU pool worker died, restarting pool")
+            self.discard(executor)
+            return self.start().submit(fn, *args).result()
+
+    def discard(self, executor):
+        with self.lock:
+            # Thread lain mungkin sudah membuat pool baru
+            if self.executor is executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+                self.executor = None
+
+    def compute_scores(self, spec: tuple, X):
+        return self.run(compute_scores, spec, X)
+
+    def compute_explanations(self, spec: tuple, X, top_k: int):
+        return self.run(compute_explanations, spec, X, top_k)
+
+    def shutdown(self):
+        with self.lock:
+            if self.executor is not None:
+                self.executor.shutdown(wait=False, cancel_futures=True)
+                self.executor = None
+
+cpu_pool = CpuPool(CPU_POOL_WORKERS)
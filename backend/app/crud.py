@@ -1,41 +1,382 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, insert, or_, select, text, tuple_, update
+from sqlalchemy.sql.expression import UnaryExpression
+from sqlalchemy.sql.operators import custom_op
 from . import models, schemas
-from datetime import datetime
-from . import auth
+from . import activity, auth, stats
+from collections import defaultdict
+import base64
+import json
+import os
+
+# Bulk insert leads di PostgreSQL: "copy" (COPY FROM STDIN) atau "executemany" (INSERT ... RETURNING)
+PG_BULK_INSERT = os.getenv("PG_BULK_INSERT", "copy")
 
 # 1. Simpan Lead Baru ke Database
-def create_lead(db: Session, lead_data: dict, prediction: dict):
+def create_lead(db: Session, lead_data: dict, prediction: dict, user_id: int = None):
     db_lead = models.Lead(
         **lead_data, # Unpack data input nasabah
         prediction_score=prediction.get("score"),
-        prediction_label=prediction.get("label")
+        prediction_label=prediction.get("label"),
+        model_version=prediction.get("model_version")
     )
     db.add(db_lead)
+    stats.apply_leads(db, [{**lead_data, "prediction_score": db_lead.prediction_score, "prediction_label": db_lead.prediction_label}])
+    db.flush() # Butuh id lead untuk activity log
+    activity.record_leads(db, [db_lead.id], [db_lead.prediction_label], user_id)
     db.commit()
     db.refresh(db_lead)
     return db_lead
 
+# 1b. Simpan Banyak Lead Sekaligus (Bulk Insert per Chunk, 1 commit per chunk)
+def create_leads_bulk(db: Session, leads_data: list, predictions: list, chunk_size: int = 5000, user_id: int = None,
+                      commit: bool = True):
+    # commit=False: pemanggil yang commit (ingest: sekalian dengan progress job, lihat ingest_csv)
+    inserted_ids = []
+    rows = [
+        {
+            **lead_data,
+            "prediction_score": prediction.get("score"),
+            "prediction_label": prediction.get("label"),
+            "model_version": prediction.get("model_version")
+        }
+        for lead_data, prediction in zip(leads_data, predictions)
+    ]
+
+    use_copy = copy_supported(db.get_bind().dialect)
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        if use_copy:
+            chunk_ids = copy_leads(db, chunk)
+        else:
+            # executemany (SQLite / PostgreSQL "insertmanyvalues"), id dikembalikan lewat RETURNING
+            chunk_ids = db.execute(insert(models.Lead).returning(models.Lead.id), chunk).scalars().all()
+        inserted_ids.extend(chunk_ids)
+        # Ringkasan dashboard & activity log ikut di-update dalam transaksi yang sama
+        stats.apply_leads(db, chunk)
+        activity.record_leads(db, chunk_ids, [row["prediction_label"] for row in chunk], user_id)
+        if commit:
+            db.commit()
+
+    return inserted_ids
+
+def copy_supported(dialect) -> bool:
+    """
+    COPY lewat cursor.copy() hanya ada di psycopg 3 (postgresql+psycopg://).
+    Driver lain (psycopg2, asyncpg, ...) & SQLite pakai executemany + RETURNING.
+    """
+    return PG_BULK_INSERT == "copy" and dialect.name == "postgresql" and dialect.driver == "psycopg"
+
+def copy_leads(db: Session, rows: list) -> list:
+    """
+    Bulk insert PostgreSQL lewat COPY ... FROM STDIN (jauh lebih cepat dari INSERT per baris).
+    COPY tidak bisa RETURNING, jadi id dialokasikan dulu dari sequence lalu ikut di-COPY.
+    """
+    if not rows:
+        return []
+    table = models.Lead.__table__
+    ids = db.execute(
+        text("SELECT nextval(pg_get_serial_sequence('leads', 'id')) FROM generate_series(1, :n)"),
+        {"n": len(rows)}
+    ).scalars().all()
+
+    # Kolom yang ada di data + kolom dengan default di sisi Python (mis. balance=0.0);
+    # created_at/updated_at diisi server_default oleh PostgreSQL
+    columns = [table.c.id] + [
+        column for column in table.columns
+        if column.name != "id" and (column.name in rows[0] or (column.default is not None and column.default.is_scalar))
+    ]
+    defaults = {column.name: column.default.arg for column in columns if column.default is not None and column.default.is_scalar}
+    integer_columns = {column.name for column in columns if column.type.python_type is int}
+
+    def to_copy_value(name, value):
+        if value is None or value != value: # None / NaN -> NULL
+            return None
+        return int(value) if name in integer_columns else value
+
+    quote = db.get_bind().dialect.identifier_preparer.quote
+    sql = f"COPY {quote(table.name)} ({', '.join(quote(column.name) for column in columns)}) FROM STDIN"
+    names = [column.name for column in columns[1:]]
+    cursor = db.connection().connection.driver_connection.cursor()
+    with cursor.copy(sql) as copy:
+        for lead_id, row in zip(ids, rows):
+            copy.write_row([lead_id] + [to_copy_value(name, row.get(name, defaults.get(name))) for name in names])
+    return ids
+
+# 1c. Update Skor Lead (mis. rescoring dengan model baru), ringkasan dashboard ikut disesuaikan
+def update_lead_prediction(db: Session, db_lead: models.Lead, prediction: dict, commit: bool = True):
+    stats.apply_score_change(
+        db, db_lead.prediction_score, db_lead.prediction_label,
+        prediction.get("score"), prediction.get("label")
+    )
+    db_lead.prediction_score = prediction.get("score")
+    db_lead.prediction_label = prediction.get("label")
+    db_lead.model_version = prediction.get("model_version")
+    if commit:
+        db.commit()
+    return db_lead
+
+# 1d. Versi batch untuk rescoring job: 1 UPDATE executemany + 1 UPSERT ringkasan, 1 commit
+def update_lead_predictions_bulk(db: Session, leads: list, predictions: list, commit: bool = True):
+    """leads: baris dari get_leads_to_rescore (punya id, prediction_score, prediction_label)"""
+    stats.apply_score_changes(db, [
+        (lead["prediction_score"], lead["prediction_label"], prediction.get("score"), prediction.get("label"))
+        for lead, prediction in zip(leads, predictions)
+    ])
+    db.execute(update(models.Lead), [
+        {
+            "id": lead["id"],
+            "prediction_score": prediction.get("score"),
+            "prediction_label": prediction.get("label"),
+            "model_version": prediction.get("model_version")
+        }
+        for lead, prediction in zip(leads, predictions)
+    ])
+    if commit:
+        db.commit()
+
+# 1e. Cek dedup: lead yang content_hash-nya ada di `hashes` (set-based, 1 query per batch hash)
+def get_leads_by_content_hashes(db: Session, hashes, batch_size: int = 1000):
+    """content_hash -> list baris lead (id, prediction_score, prediction_label)"""
+    Lead = models.Lead
+    hashes = list(hashes)
+    found = defaultdict(list)
+    for start in range(0, len(hashes), batch_size):
+        stmt = select(Lead.id, Lead.content_hash, Lead.prediction_score, Lead.prediction_label).where(
+            Lead.content_hash.in_(hashes[start:start + batch_size])
+        )
+        for row in db.execute(stmt).mappings():
+            found[row["content_hash"]].append(row)
+    return found
+
+def get_leads_without_content_hash(db: Session, limit: int = 5000):
+    stmt = select(models.Lead.__table__).where(models.Lead.content_hash.is_(None)).order_by(models.Lead.id.asc()).limit(limit)
+    return db.execute(stmt).mappings().all()
+
+def set_content_hashes(db: Session, lead_ids: list, hashes: list):
+    db.execute(update(models.Lead), [{"id": lead_id, "content_hash": h} for lead_id, h in zip(lead_ids, hashes)])
+    db.commit()
+
+def needs_rescore(model_version: str):
+    return or_(models.Lead.model_version.is_(None), models.Lead.model_version != model_version)
+
+def has_unversioned_leads(db: Session) -> bool:
+    """Ada lead yang belum dicap model_version (diskor sebelum ada registry model)?"""
+    return db.query(models.Lead.id).filter(models.Lead.model_version.is_(None)).first() is not None
+
+def count_leads_to_rescore(db: Session, model_version: str):
+    return db.query(func.count(models.Lead.id)).filter(needs_rescore(model_version)).scalar()
+
+def get_leads_to_rescore(db: Session, model_version: str, after_id: int = 0, limit: int = 5000):
+    """Lead yang skornya belum dari model_version, urut id (keyset, jadi job bisa dilanjutkan)"""
+    stmt = (
+        select(models.Lead.__table__)
+        .where(models.Lead.id > after_id, needs_rescore(model_version))
+        .order_by(models.Lead.id.asc())
+        .limit(limit)
+    )
+    return db.execute(stmt).mappings().all()
+
+def get_leads_by_ids(db: Session, lead_ids: list):
+    return db.query(models.Lead).filter(models.Lead.id.in_(lead_ids)).order_by(models.Lead.id.asc()).all()
+
 # 2. Ambil List Leads (dengan Pagination biar ringan)
-def get_leads(db: Session, skip: int = 0, limit: int = 100, sort_by: str = "newest"):
-    query = db.query(models.Lead)
-    
-    # Logika Sorting
-    if sort_by == "score_high":
-        query = query.order_by(models.Lead.prediction_score.desc())
-    elif sort_by == "score_low":
-        query = query.order_by(models.Lead.prediction_score.asc())
-    elif sort_by == "oldest":
-        query = query.order_by(models.Lead.id.asc())
-    else: # Default: Newest (ID Descending)
-        query = query.order_by(models.Lead.id.desc())
-        
-    return query.offset(skip).limit(limit).all()
+# Kolom urutan per sort_by: (kolom skor atau None, arah). id selalu jadi tiebreaker.
+LEAD_SORTS = {
+    "newest": (None, "desc"),
+    "oldest": (None, "asc"),
+    "score_high": ("prediction_score", "desc"),
+    "score_low": ("prediction_score", "asc"),
+}
+
+def encode_cursor(lead: models.Lead, sort_by: str = "newest") -> str:
+    # Token opaque: base64 dari (score, id) lead terakhir di halaman ini
+    score_column, _ = LEAD_SORTS.get(sort_by, LEAD_SORTS["newest"])
+    key = [getattr(lead, score_column), lead.id] if score_column else [lead.id]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+def decode_cursor(token: str, sort_by: str = "newest"):
+    score_column, _ = LEAD_SORTS.get(sort_by, LEAD_SORTS["newest"])
+    try:
+        key = json.loads(base64.urlsafe_b64decode(token.encode()))
+        if len(key) != (2 if score_column else 1):
+            raise ValueError
+        return key
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def get_leads(db: Session, skip: int = 0, limit: int = 100, sort_by: str = "newest", after: str = None, **filters):
+    # filters: lihat lead_filters (label, skor, job, education, month, created_at)
+    score_column, direction = LEAD_SORTS.get(sort_by, LEAD_SORTS["newest"])
+    descending = direction == "desc"
+    Lead = models.Lead
+    if score_column or db.get_bind().dialect.name != "sqlite":
+        query = db.query(Lead).filter(*lead_filters(**filters))
+    else:
+        # Sort newest/oldest di SQLite: jalan urut primary key & cek filter per baris (halaman penuh
+        # setelah ~limit / selektivitas baris). Tanpa statistik, SQLite memilih index filter (mis. label)
+        # lalu sort SEMUA hasilnya (TEMP B-TREE), puluhan ms per halaman di jutaan lead.
+        query = db.query(Lead).filter(*lead_filters(**filters, use_indexes=False), *created_id_bounds(**filters))
+
+    # Logika Sorting (pakai index (prediction_score, id) / primary key)
+    if score_column:
+        score = getattr(Lead, score_column)
+        query = query.order_by(score.desc(), Lead.id.desc()) if descending else query.order_by(score.asc(), Lead.id.asc())
+    else:
+        query = query.order_by(Lead.id.desc()) if descending else query.order_by(Lead.id.asc())
+
+    if after is None:
+        # Jalur lama (kompatibilitas): OFFSET makin lambat di halaman dalam
+        return query.offset(skip).limit(limit).all()
+
+    # Keyset pagination: lanjut dari lead terakhir halaman sebelumnya, tidak perlu skip baris
+    key = decode_cursor(after, sort_by)
+    if not score_column:
+        last_id = key[0]
+        return query.filter(Lead.id < last_id if descending else Lead.id > last_id).limit(limit).all()
+
+    # Lead dengan skor NULL (model gagal) ada di salah satu ujung urutan. SQLite menganggap NULL
+    # paling kecil (akhir saat DESC, awal saat ASC), PostgreSQL paling besar (kebalikannya).
+    # Tiap segmen di-query terpisah tanpa OR, supaya tetap bisa SEARCH langsung lewat index (score, id).
+    last_score, last_id = key
+    score = getattr(Lead, score_column)
+    after_id = Lead.id < last_id if descending else Lead.id > last_id
+    nulls_at_end = descending == (db.get_bind().dialect.name == "sqlite")
+    if last_score is None:
+        segments = [query.filter(score.is_(None), after_id)]
+        if not nulls_at_end:
+            segments.append(query.filter(score.isnot(None)))
+    else:
+        after_key = tuple_(score, Lead.id) < tuple_(last_score, last_id) if descending else tuple_(score, Lead.id) > tuple_(last_score, last_id)
+        segments = [query.filter(after_key)]
+        if nulls_at_end:
+            segments.append(query.filter(score.is_(None)))
+
+    leads = []
+    for segment in segments:
+        leads += segment.limit(limit - len(leads)).all()
+        if len(leads) >= limit:
+            break
+    return leads
+
+# 2a. Filter leads, dipakai bersama oleh list, count & export (lihat export.py)
+# Filter kategori (kesamaan) -> kolom. Sengaja tidak ada index per kolom (biaya ingest, lihat
+# benchmarks/bench_lead_filters.py): halaman newest/oldest jalan urut primary key, score_high/score_low
+# lewat ix_leads_score_id (label: ix_leads_label_score_id), count satu filter dari ringkasan dashboard.
+LEAD_CATEGORY_FILTERS = {
+    "label": "prediction_label",
+    "job": "job",
+    "education": "education",
+    "month": "month",
+}
+
+def lead_filters(label: str = None, min_score: float = None, max_score: float = None,
+                 created_from=None, created_to=None, job: str = None, education: str = None,
+                 month: str = None, use_indexes: bool = True) -> list:
+    """use_indexes=False (hanya SQLite): filter tidak memakai index kolomnya, lihat without_index"""
+    Lead = models.Lead
+    column = (lambda c: c) if use_indexes else without_index
+    conditions = []
+    for name, value in (("label", label), ("job", job), ("education", education), ("month", month)):
+        if value is not None:
+            conditions.append(column(getattr(Lead, LEAD_CATEGORY_FILTERS[name])) == value)
+    if min_score is not None:
+        conditions.append(column(Lead.prediction_score) >= min_score)
+    if max_score is not None:
+        conditions.append(column(Lead.prediction_score) <= max_score)
+    if created_from is not None:
+        conditions.append(column(Lead.created_at) >= created_from)
+    if created_to is not None:
+        conditions.append(column(Lead.created_at) < created_to)
+    return conditions
+
+def without_index(column):
+    """"+kolom": cara SQLite untuk tidak memakai index (atau optimasi min/max) kolom itu"""
+    return UnaryExpression(column, operator=custom_op("+"), type_=column.type)
+
+def created_id_bounds(created_from=None, created_to=None, **_) -> list:
+    """
+    SQLite: jendela created_at -> rentang id (min/max id yang created_at-nya di jendela, lewat ix_leads_created_at),
+    supaya sort newest/oldest langsung mulai dari jendela itu, bukan scan dari ujung tabel.
+    Filter created_at tetap dipakai, jadi tetap benar walaupun urutan id & created_at tidak sama persis.
+    """
+    Lead = models.Lead
+    window = lead_filters(created_from=created_from, created_to=created_to)
+    if not window:
+        return []
+    return [
+        Lead.id >= select(func.min(without_index(Lead.id))).where(*window).scalar_subquery(),
+        Lead.id <= select(func.max(without_index(Lead.id))).where(*window).scalar_subquery(),
+    ]
+
+def count_leads(db: Session, **filters) -> int:
+    active = {name: value for name, value in filters.items() if value is not None}
+    # Tanpa filter / satu filter label, job, education atau month: ambil dari ringkasan dashboard (1 baris via primary key)
+    if not active:
+        return stats.bucket_count(db, "total", "all")
+    if len(active) == 1:
+        (name, value), = active.items()
+        if name in stats.COUNT_DIMENSIONS:
+            return stats.bucket_count(db, name, value)
+    # SELECT count(*) ... WHERE langsung (bukan Query.count() yang membungkus subquery).
+    # Skor / created_at pakai index-nya, kombinasi filter kategori = scan tabel
+    return db.query(func.count()).select_from(models.Lead).filter(*lead_filters(**filters)).scalar()
+
+# 2b. Export: hasil di-stream per chunk (lihat export.py)
+def export_leads_query(**filters):
+    return select(models.Lead.__table__).where(*lead_filters(**filters)).order_by(models.Lead.id.asc())
 
 # 3. Ambil Detail Satu Lead
 def get_lead_by_id(db: Session, lead_id: int):
     return db.query(models.Lead).filter(models.Lead.id == lead_id).first()
 
+def update_lead_notes(db: Session, lead_id: int, notes: str, user_id: int = None):
+    db_lead = get_lead_by_id(db, lead_id)
+    if db_lead is None:
+        return None
+    db_lead.notes = notes
+    activity.record(db, "notes_updated", user_id, lead_id=lead_id)
+    db.commit()
+    return db_lead
+
+# 3b. Cache Penjelasan SHAP (per lead + versi model)
+def get_lead_explanation(db: Session, lead_id: int, model_version: str):
+    cached = db.query(models.LeadExplanation).filter(
+        models.LeadExplanation.lead_id == lead_id,
+        models.LeadExplanation.model_version == model_version
+    ).first()
+    if not cached:
+        return None
+    return {"shap_values": cached.shap_values, "recommendation": cached.recommendation}
+
+def save_lead_explanation(db: Session, lead_id: int, model_version: str, explanation: dict):
+    # Timpa entry lama (versi model lama) kalau ada
+    cached = db.query(models.LeadExplanation).filter(models.LeadExplanation.lead_id == lead_id).first()
+    if not cached:
+        cached = models.LeadExplanation(lead_id=lead_id)
+        db.add(cached)
+    cached.model_version = model_version
+    cached.shap_values = explanation["shap_values"]
+    cached.recommendation = explanation["recommendation"]
+    db.commit()
+
+def create_lead_explanations_bulk(db: Session, lead_ids: list, model_version: str, explanations: list, commit: bool = True):
+    # Untuk lead yang baru di-insert (belum punya cache), jadi cukup INSERT sekaligus
+    rows = [
+        {
+            "lead_id": lead_id,
+            "model_version": model_version,
+            "shap_values": explanation["shap_values"],
+            "recommendation": explanation["recommendation"]
+        }
+        for lead_id, explanation in zip(lead_ids, explanations)
+        if explanation is not None
+    ]
+    if rows:
+        db.execute(insert(models.LeadExplanation), rows)
+        if commit:
+            db.commit()
+
 from sqlalchemy import case
 
 def get_dashboard_stats(db: Session):
@@ -121,38 +462,32 @@ def get_user_performance(db: Session):
         }
     }
     
-def get_user_profile(db: Session):
-    # Ambil user pertama (karena kita cuma punya 1 user untuk sekarang)
-    user = db.query(models.UserProfile).first()
-    if not user:
+def get_profile_row(db: Session, user_id: int = None):
+    # Login: profil milik user itu. Tanpa login: profil pertama (mode 1 user)
+    query = db.query(models.UserProfile)
+    if user_id is not None:
+        query = query.filter(models.UserProfile.user_id == user_id)
+    profile = query.first()
+    if not profile:
         # Jika belum ada, buat default
-        user = models.UserProfile()
-        db.add(user)
+        profile = models.UserProfile(user_id=user_id)
+        db.add(profile)
         db.commit()
-        db.refresh(user)
-    
-    # Hitung Performa Real-time
-    total_leads = db.query(models.Lead).count()
-    high_leads = db.query(models.Lead).filter(models.Lead.prediction_label == "High Potential").count()
-    
-    # Hitung Active Days (Selisih hari ini dengan data lead pertama)
-    first_lead = db.query(models.Lead).order_by(models.Lead.created_at.asc()).first()
-    active_days = (datetime.now() - first_lead.created_at).days + 1 if first_lead else 0
+        db.refresh(profile)
+    return profile
 
-    # Ambil 5 Aktivitas Terbaru (Recent Activity)
-    recent_leads = db.query(models.Lead).order_by(models.Lead.updated_at.desc()).limit(5).all()
+def get_user_profile(db: Session, user_id: int = None):
+    user = get_profile_row(db, user_id)
     
-    activities = []
-    for lead in recent_leads:
-        # Jika updated_at != created_at, berarti itu sebuah Update Notes
-        is_updated = lead.updated_at > lead.created_at
-        action = "Updated notes for" if is_updated else "Added to database"
-        
-        activities.append({
-            "lead_id": lead.id, 
-            "time": lead.updated_at.strftime("%Y-%m-%d %H:%M"),
-            "content": f"{action} Nasabah-{lead.id}"
-        })
+    # Performa dari counter activity log (user yang login, atau semua user kalau tanpa login),
+    # bukan scan tabel leads. Active Days dihitung dari aktivitas pertama.
+    summary = activity.summary(db, user_id)
+    total_leads = summary["leads_added"]
+    high_leads = summary["high_potential_added"]
+    active_days = activity.active_days(summary["first_activity_at"])
+
+    # 5 Aktivitas Terbaru (Recent Activity) langsung dari log
+    activities = activity.recent(db, user_id, limit=5)
 
     return {
         "id": user.id,
@@ -171,9 +506,9 @@ def get_user_profile(db: Session):
         "recent_activities": activities
     }
 
-def update_user_profile(db: Session, data: dict):
-    # 1. Ambil profil yang ada di database
-    profile = db.query(models.UserProfile).first()
+def update_user_profile(db: Session, data: dict, user_id: int = None):
+    # 1. Ambil profil yang ada di database (milik user yang login, lihat get_profile_row)
+    profile = get_profile_row(db, user_id)
     
     if profile:
         # 2. Tentukan field mana saja yang boleh di-update (Sesuai kolom di DB)
@@ -192,8 +527,9 @@ def update_user_profile(db: Session, data: dict):
 def get_user_by_username(db: Session, username: str):
     return db.query(models.User).filter(models.User.username == username).first()
 
-def create_user(db: Session, user_data: dict):
-    hashed_pwd = auth.get_password_hash(user_data['password'])
+def create_user(db: Session, user_data: dict, hashed_password: str = None):
+    # hashed_password: sudah di-hash di luar (executor bcrypt), selain itu di-hash di sini
+    hashed_pwd = hashed_password or auth.get_password_hash(user_data['password'])
     db_user = models.User(username=user_data['username'], hashed_password=hashed_pwd)
     db.add(db_user)
     db.commit()
@@ -210,4 +546,49 @@ def create_user(db: Session, user_data: dict):
     db.add(db_profile)
     db.commit()
     
-    return db_user
\ No newline at end of file
+    return db_user
+
+# --- Background Ingestion Jobs ---
+def create_ingest_job(db: Session, filename: str, explain: bool = False, dedup: str = "none", user_id: int = None):
+    db_job = models.IngestJob(filename=filename, status="queued", explain=explain, dedup=dedup, user_id=user_id)
+    db.add(db_job)
+    db.commit()
+    db.refresh(db_job)
+    return db_job
+
+def get_ingest_job(db: Session, job_id: int):
+    return db.query(models.IngestJob).filter(models.IngestJob.id == job_id).first()
+
+def get_pending_ingest_jobs(db: Session):
+    return db.query(models.IngestJob).filter(models.IngestJob.status.in_(["queued", "running"])).order_by(models.IngestJob.id.asc()).all()
+
+# --- RESCORING JOBS ---
+def create_rescore_job(db: Session, model_name: str, model_version: str):
+    db_job = models.RescoreJob(model_name=model_name, model_version=model_version, status="queued")
+    db.add(db_job)
+    db.commit()
+    db.refresh(db_job)
+    return db_job
+
+def get_rescore_job(db: Session, job_id: int):
+    return db.query(models.RescoreJob).filter(models.RescoreJob.id == job_id).first()
+
+def get_pending_rescore_jobs(db: Session):
+    return db.query(models.RescoreJob).filter(models.RescoreJob.status.in_(["queued", "running"])).order_by(models.RescoreJob.id.asc()).all()
+
+
+# --- SHADOW SCORING (A/B model aktif vs kandidat) ---
+def create_shadow_scores_bulk(db: Session, rows: list):
+    db.execute(insert(models.ShadowScore), rows)
+    db.commit()
+
+def get_shadow_scores(db: Session, shadow_version: str, active_version: str, limit: int = 1000):
+    """limit baris terakhir untuk pasangan model ini (window laporan)"""
+    ShadowScore = models.ShadowScore
+    return db.query(
+        ShadowScore.active_score, ShadowScore.active_label,
+        ShadowScore.shadow_score, ShadowScore.shadow_label
+    ).filter(
+        ShadowScore.shadow_version == shadow_version,
+        ShadowScore.active_version == active_version
+    ).order_by(ShadowScore.id.desc()).limit(limit).all()
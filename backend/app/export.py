@@ -0,0 +1,117 @@
+import csv
+import io
+import os
+from datetime import datetime
+
+from . import crud, models
+from .database import SessionLocal
+
+# Jumlah baris per fetch dari cursor DB (sekaligus ukuran row group Parquet / record batch Arrow)
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", 10000))
+
+# format -> (media type, ekstensi file)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+}
+EXPORT_COLUMNS = [column.name for column in models.Lead.__table__.columns]
+
+class ChunkSink(io.RawIOBase):
+    """File tujuan writer Parquet/Arrow yang isinya bisa diambil (drain) per chunk, jadi output tidak menumpuk di memori"""
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+def iter_chunks(filters: dict, chunk_size: int):
+    """
+    Baris lead (tuple, urut id) per chunk. yield_per = server-side cursor di PostgreSQL
+    (named cursor), jadi hasil query tidak pernah di-load utuh ke memori.
+    Session sendiri (bukan dependency request) karena dipakai selama response di-stream.
+    """
+    db = SessionLocal()
+    try:
+        result = db.execute(crud.export_leads_query(**filters), execution_options={"yield_per": chunk_size})
+        for rows in result.partitions():
+            yield rows
+    finally:
+        db.close()
+
+def stream_csv(filters: dict, chunk_size: int = EXPORT_CHUNK_SIZE):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for rows in iter_chunks(filters, chunk_size):
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode() # Hanya header (tidak ada lead yang cocok)
+
+def arrow_schema():
+    import pyarrow as pa
+    types = {int: pa.int64(), float: pa.float64(), str: pa.string(), datetime: pa.timestamp("us")}
+    return pa.schema([(column.name, types[column.type.python_type]) for column in models.Lead.__table__.columns])
+
+def to_record_batch(rows: list, schema):
+    import pyarrow as pa
+    columns = list(zip(*rows))
+    return pa.RecordBatch.from_arrays(
+        [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+        schema=schema
+    )
+
+def stream_arrow(filters: dict, chunk_size: int = EXPORT_CHUNK_SIZE):
+    """Arrow IPC stream: satu record batch per chunk"""
+    import pyarrow as pa
+    schema = arrow_schema()
+    sink = ChunkSink()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for rows in iter_chunks(filters, chunk_size):
+            writer.write_batch(to_record_batch(rows, schema))
+            yield sink.drain()
+    yield sink.drain() # Penanda akhir stream
+
+def stream_parquet(filters: dict, chunk_size: int = EXPORT_CHUNK_SIZE):
+    """Parquet: satu row group per chunk, footer ditulis di akhir"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    schema = arrow_schema()
+    sink = ChunkSink()
+    with pq.ParquetWriter(sink, schema, compression="snappy") as writer:
+        for rows in iter_chunks(filters, chunk_size):
+            writer.write_table(pa.Table.from_batches([to_record_batch(rows, schema)]))
+            yield sink.drain()
+    yield sink.drain()
+
+def check_format(export_format: str):
+    """ValueError kalau format tidak dikenal, atau butuh pyarrow yang belum terinstall"""
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"format must be one of {', '.join(EXPORT_FORMATS)}")
+    if export_format != "csv":
+        try:
+            import pyarrow # noqa: F401
+        except ImportError:
+            raise ValueError(f"Export format {export_format} requires pyarrow")
+
+STREAMERS = {"csv": stream_csv, "parquet": stream_parquet, "arrow": stream_arrow}
+
+def stream_leads(export_format: str, filters: dict, chunk_size: int = EXPORT_CHUNK_SIZE):
+    return STREAMERS[export_format](filters, chunk_size)
@@ -0,0 +1,93 @@
+import math
+import numpy as np
+import pandas as pd
+
+# Kolom kategorikal mentah (sebelum One-Hot Encoding, sesuai notebook 02B)
+CATEGORICAL_FEATURES = [
+    "job", "marital", "education", "default", "housing", "loan",
+    "contact", "month", "day_of_week", "poutcome"
+]
+
+def to_float(value) -> float:
+    # Sama seperti pd.to_numeric(errors='coerce'): nilai yang tidak valid jadi NaN
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+class FeatureEncoder:
+    """
+    Encoder yang "dikompilasi" sekali dari model_features.json.
+    Fitur ditulis langsung ke matriks NumPy float32 yang sudah dialokasikan,
+    tanpa DataFrame/get_dummies per lead.
+    """
+    def __init__(self, columns: list):
+        self.columns = list(columns)
+        self.n_features = len(self.columns)
+        self.numeric_slots = {}    # nama kolom (versi underscore) -> index
+        self.category_index = {}   # kolom kategorikal -> {nilai kategori: index}
+        self.contacted_slot = None # index 'pernah_dihubungi' (diturunkan dari pdays)
+
+        for i, col in enumerate(self.columns):
+            cat = next((c for c in CATEGORICAL_FEATURES if col.startswith(c + "_")), None)
+            if cat:
+                # Kategori baseline (yang di-drop saat training) tidak punya slot -> tetap 0
+                self.category_index.setdefault(cat, {})[col[len(cat) + 1:]] = i
+            elif col == "pernah_dihubungi":
+                self.contacted_slot = i
+            else:
+                self.numeric_slots[col.replace('.', '_')] = i
+
+    def empty(self, n_rows: int) -> np.ndarray:
+        return np.zeros((n_rows, self.n_features), dtype=np.float32)
+
+    def encode_into(self, data: dict, row: np.ndarray):
+        """Tulis satu lead (dict) ke satu baris matriks"""
+        for key, value in data.items():
+            # 'emp.var.rate' (CSV) dan 'emp_var_rate' (DB) sama-sama kebaca
+            key = key.replace('.', '_')
+            if key in self.numeric_slots:
+                row[self.numeric_slots[key]] = to_float(value)
+            elif key in self.category_index:
+                idx = self.category_index[key].get(value)
+                if idx is not None:
+                    row[idx] = 1.0
+            elif key == 'pdays' and self.contacted_slot is not None:
+                pdays = to_float(value)
+                row[self.contacted_slot] = 0.0 if math.isnan(pdays) or pdays == 999 else 1.0
+
+    def encode_one(self, data: dict) -> np.ndarray:
+        X = self.empty(1)
+        self.encode_into(data, X[0])
+        return X
+
+    def encode_records(self, records: list) -> np.ndarray:
+        X = self.empty(len(records))
+        for i, data in enumerate(records):
+            self.encode_into(data, X[i])
+        return X
+
+    def encode_frame(self, df: pd.DataFrame) -> np.ndarray:
+        """Versi vektor untuk DataFrame (chunk CSV): diproses per kolom, bukan per baris"""
+        X = self.empty(len(df))
+        source = {c.replace('.', '_'): c for c in df.columns}
+
+        # 1. Fitur numerik
+        for key, idx in self.numeric_slots.items():
+            if key in source:
+                X[:, idx] = pd.to_numeric(df[source[key]], errors='coerce').to_numpy(dtype=np.float32, na_value=np.nan)
+
+        # 2. Feature Engineering: pdays -> pernah_dihubungi
+        if 'pdays' in source and self.contacted_slot is not None:
+            pdays = pd.to_numeric(df[source['pdays']], errors='coerce').fillna(999).to_numpy()
+            X[:, self.contacted_slot] = pdays != 999
+
+        # 3. One-Hot Encoding via lookup table nilai -> index kolom
+        for cat, lookup in self.category_index.items():
+            if cat not in source:
+                continue
+            codes = df[source[cat]].map(lookup).to_numpy(dtype=np.float64, na_value=np.nan)
+            rows = np.flatnonzero(~np.isnan(codes))
+            X[rows, codes[rows].astype(np.intp)] = 1.0
+
+        return X
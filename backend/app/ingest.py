@@ -0,0 +1,187 @@
+import csv
+import os
+import time
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+
+from . import models, crud, metrics
+from .ml_service import ml_service
+from .shadow import shadow_scorer
+
+# Jumlah baris per chunk (dibaca, diskor, lalu di-commit sebelum chunk berikutnya)
+INGEST_CHUNK_SIZE = int(os.getenv("INGEST_CHUNK_SIZE", 5000))
+# Berapa byte awal file yang dipakai untuk menebak delimiter
+SNIFF_BYTES = 64 * 1024
+
+# Mode dedup upload (berdasarkan content_hash):
+# "none" = semua baris di-insert (perilaku lama), "skip" = baris yang sudah ada dilewati
+# (tanpa inference), "update" = baris yang sudah ada diskor ulang & prediksinya di-update
+DEDUP_MODES = ("none", "skip", "update")
+# Jumlah hash per query IN (...) saat cek baris yang sudah ada
+HASH_LOOKUP_BATCH = 1000
+# Kolom yang bukan isi data nasabah (tidak ikut content_hash)
+NON_CONTENT_COLUMNS = {
+    "id", "balance", "notes", "prediction_score", "prediction_label", "model_version",
+    "content_hash", "created_at", "updated_at"
+}
+CONTENT_COLUMNS = [c for c in models.Lead.__table__.columns if c.name not in NON_CONTENT_COLUMNS]
+
+def sniff_delimiter(sample: bytes) -> str:
+    """Tebak delimiter (';' atau ',') dari beberapa KB pertama file"""
+    text = sample.decode('utf-8', errors='ignore')
+    try:
+        return csv.Sniffer().sniff(text, delimiters=';,').delimiter
+    except csv.Error:
+        # Fallback: hitung delimiter di baris header
+        header = text.splitlines()[0] if text else ""
+        return ';' if header.count(';') > header.count(',') else ','
+
+def to_db_records(df: pd.DataFrame) -> list:
+    # Ganti titik jadi underscore HANYA untuk database (ML tetap pakai nama asli)
+    valid_db_columns = models.Lead.__table__.columns.keys()
+    db_columns = {k: k.replace('.', '_') for k in df.columns if k.replace('.', '_') in valid_db_columns}
+    df = df[list(db_columns)].rename(columns=db_columns)
+    # NaN -> None: SQLite menyimpan NaN sebagai NULL, PostgreSQL menolak NaN di kolom integer
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+def content_hashes(df: pd.DataFrame) -> list:
+    """
+    Hash 64-bit (hex) isi data setiap lead, dihitung vektor per kolom untuk satu DataFrame.
+    Kolom CSV ('emp.var.rate') dan DB/API ('emp_var_rate') dianggap sama, angka selalu
+    dibandingkan sebagai float (30 == 30.0) dan nilai kosong sebagai string kosong,
+    jadi lead yang sama dari upload CSV maupun POST /api/v1/leads dapat hash yang sama.
+    """
+    source = {c.replace('.', '_'): c for c in df.columns}
+    canonical = {}
+    for column in CONTENT_COLUMNS:
+        if column.name in source:
+            values = df[source[column.name]]
+        else:
+            values = pd.Series([None] * len(df), index=df.index, dtype=object)
+        if column.type.python_type in (int, float):
+            canonical[column.name] = pd.to_numeric(values, errors='coerce').astype('float64')
+        else:
+            canonical[column.name] = values.astype(object).where(values.notna(), "").astype(str)
+    hashed = pd.util.hash_pandas_object(pd.DataFrame(canonical), index=False)
+    return [format(h, '016x') for h in hashed.to_numpy().tolist()]
+
+def ingest_csv(db: Session, fileobj, chunk_size: int = INGEST_CHUNK_SIZE, on_chunk=None, skip_rows: int = 0,
+               explain: bool = False, dedup: str = "none", user_id: int = None):
+    """
+    Pipeline parse -> score -> insert per chunk.
+    File dibaca bertahap (tidak pernah di-load utuh), jadi pemakaian memori
+    sebanding dengan chunk_size, bukan ukuran file.
+    skip_rows dipakai untuk melanjutkan job yang terputus (baris yang sudah masuk DB dilewati).
+    Semua tulisan satu chunk + on_chunk (progress job) di-commit dalam SATU transaksi, jadi setelah
+    crash baris yang sudah masuk selalu sama dengan progress yang tercatat (resume tidak dobel insert).
+    explain=True sekalian menghitung & menyimpan penjelasan SHAP per chunk.
+    dedup: lihat DEDUP_MODES. Cek duplikat per chunk pakai index content_hash (query IN per batch hash).
+    user_id: user yang meng-upload, dicatat di activity log (satu event per chunk).
+    Waktu tiap tahap (parse, hash, dedup, encode, predict, insert, ...) dikembalikan di stage_seconds
+    dan dicatat ke histogram ingest_stage_seconds (/metrics).
+    """
+    if dedup not in DEDUP_MODES:
+        raise ValueError(f"Invalid dedup mode: {dedup}")
+
+    sep = sniff_delimiter(fileobj.read(SNIFF_BYTES))
+    fileobj.seek(0)
+
+    start = time.perf_counter()
+    rows = 0 # Baris CSV yang sudah diproses (dipakai juga untuk resume job)
+    counts = {"inserted": 0, "updated": 0, "skipped": 0}
+    scoring_seconds = 0.0
+    sample_ids = []
+    timer = metrics.StageTimer()
+
+    # Satu model untuk seluruh file, walaupun model aktif di-promote di tengah upload
+    model = ml_service.current()
+
+    skiprows = (lambda i: 0 < i <= skip_rows) if skip_rows else None
+    reader = pd.read_csv(fileobj, sep=sep, chunksize=chunk_size, encoding='utf-8', skiprows=skiprows)
+    while True:
+        with timer.stage("parse"):
+            chunk = next(reader, None)
+        if chunk is None:
+            break
+
+        with timer.stage("hash"):
+            hashes = content_hashes(chunk)
+            chunk = chunk.assign(content_hash=hashes)
+
+        # 0. Dedup: baris yang hash-nya sudah ada di DB (atau muncul lebih dulu di chunk ini)
+        new_mask = np.ones(len(chunk), dtype=bool)
+        update_mask = np.zeros(len(chunk), dtype=bool)
+        existing = {}
+        if dedup != "none":
+            first = ~chunk["content_hash"].duplicated().to_numpy()
+            with timer.stage("dedup"):
+                existing = crud.get_leads_by_content_hashes(db, set(hashes), batch_size=HASH_LOOKUP_BATCH)
+            in_db = np.fromiter((h in existing for h in hashes), dtype=bool, count=len(hashes))
+            new_mask = first & ~in_db
+            if dedup == "update":
+                update_mask = first & in_db
+        scored = chunk[new_mask | update_mask]
+        is_new = new_mask[new_mask | update_mask]
+
+        # 1. Prediksi satu chunk sekaligus (baris yang di-skip tidak masuk model)
+        t0 = time.perf_counter()
+        with timer.stage("encode"):
+            X = model.encode_frame(scored)
+        with timer.stage("predict"):
+            predictions = model.predict_encoded(X)
+        chunk_seconds = time.perf_counter() - t0
+        scoring_seconds += chunk_seconds
+
+        # 2. Simpan baris baru sebelum baca chunk berikutnya
+        new_rows = scored[is_new]
+        new_predictions = [p for p, new in zip(predictions, is_new) if new]
+        with timer.stage("insert"):
+            inserted_ids = crud.create_leads_bulk(db, to_db_records(new_rows), new_predictions, chunk_size=chunk_size,
+                                                  user_id=user_id, commit=False)
+
+        # 2b. Mode update: lead yang sudah ada diskor ulang (semua lead dengan hash yang sama)
+        if update_mask.any():
+            leads, lead_predictions = [], []
+            for content_hash, prediction in zip(scored["content_hash"][~is_new], (p for p, new in zip(predictions, is_new) if not new)):
+                for lead in existing[content_hash]:
+                    leads.append(lead)
+                    lead_predictions.append(prediction)
+            with timer.stage("update"):
+                crud.update_lead_predictions_bulk(db, leads, lead_predictions, commit=False)
+
+        # 3. (Opsional) SHAP satu chunk sekaligus, supaya detail lead langsung dari cache
+        if explain and inserted_ids:
+            with timer.stage("explain"):
+                explanations = model.explain_batch(X[is_new])
+            with timer.stage("insert_explanations"):
+                crud.create_lead_explanations_bulk(db, inserted_ids, model.model_version, explanations, commit=False)
+
+        rows += len(chunk)
+        n_updated = int(update_mask.sum())
+        chunk_counts = {"inserted": len(inserted_ids), "updated": n_updated, "skipped": len(chunk) - len(inserted_ids) - n_updated}
+        for result, count in chunk_counts.items():
+            counts[result] += count
+        if len(sample_ids) < 5:
+            sample_ids.extend(inserted_ids[:5 - len(sample_ids)])
+
+        # 4. Progress (job) ikut transaksi chunk ini, lalu satu commit
+        if on_chunk:
+            on_chunk(rows, time.perf_counter() - start, counts)
+        with timer.stage("commit"):
+            db.commit()
+        for result, count in chunk_counts.items():
+            metrics.INGEST_ROWS.inc(count, result=result)
+
+        # 5. Kalau ada model shadow, baris baru diskor ulang di worker (tidak ditunggu, setelah commit)
+        with timer.stage("shadow_submit"):
+            shadow_scorer.submit(inserted_ids, new_rows, new_predictions, chunk_seconds)
+
+    return {
+        "rows": rows,
+        **counts,
+        "sample_ids": sample_ids,
+        "scoring_seconds": scoring_seconds,
+        "stage_seconds": timer.summary(),
+        "elapsed_seconds": time.perf_counter() - start
+    }
@@ -0,0 +1,245 @@
+import os
+import shutil
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from . import models, crud, ingest
+from .database import SessionLocal
+from .ml_service import ml_service
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# File upload disimpan dulu di disk supaya worker (dan job yang di-resume setelah restart) bisa membacanya
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", os.path.join(BASE_DIR, "../uploads"))
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", 2))
+# Jumlah lead per batch rescoring (1 SELECT + 1 predict + 1 UPDATE + 1 commit per batch)
+RESCORE_BATCH_SIZE = int(os.getenv("RESCORE_BATCH_SIZE", 5000))
+
+executor = ThreadPoolExecutor(max_workers=INGEST_WORKERS, thread_name_prefix="ingest")
+
+def count_rows(path: str) -> int:
+    """Hitung jumlah baris data (tanpa header) dengan membaca file per blok 1 MB"""
+    lines = 0
+    last = b"\n"
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            lines += block.count(b"\n")
+            last = block[-1:]
+    if last != b"\n":
+        lines += 1  # Baris terakhir tanpa newline
+    return max(lines - 1, 0)
+
+def submit_upload(db: Session, upload_file, explain: bool = False, dedup: str = "none", user_id: int = None) -> models.IngestJob:
+    """Simpan file upload ke disk, catat job di DB, lalu lempar ke worker pool"""
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    job = crud.create_ingest_job(db, filename=upload_file.filename, explain=explain, dedup=dedup, user_id=user_id)
+
+    path = os.path.join(UPLOAD_DIR, f"job_{job.id}.csv")
+    with open(path, 'wb') as out:
+        shutil.copyfileobj(upload_file.file, out, 1024 * 1024)
+    job.file_path = path
+    db.commit()
+
+    executor.submit(run_job, job.id)
+    return job
+
+def run_job(job_id: int):
+    db = SessionLocal()
+    try:
+        job = crud.get_ingest_job(db, job_id)
+        if job is None or job.status not in ("queued", "running"):
+            return
+
+        job.status = "running"
+        job.started_at = job.started_at or func.now()
+        if job.rows_total is None:
+            job.rows_total = count_rows(job.file_path)
+        db.commit()
+
+        # Kalau job ini di-resume setelah restart, lanjutkan dari baris terakhir yang sudah di-commit
+        base_rows = job.rows_done or 0
+        base_elapsed = job.elapsed_seconds or 0.0
+        base_counts = {
+            "inserted": job.rows_inserted or 0,
+            "updated": job.rows_updated or 0,
+            "skipped": job.rows_skipped or 0
+        }
+
+        # Tidak commit sendiri: ingest_csv commit progress ini bersama baris chunk-nya (satu transaksi)
+        def on_chunk(rows, elapsed, counts):
+            job.rows_done = base_rows + rows
+            job.elapsed_seconds = base_elapsed + elapsed
+            job.rows_inserted = base_counts["inserted"] + counts["inserted"]
+            job.rows_updated = base_counts["updated"] + counts["updated"]
+            job.rows_skipped = base_counts["skipped"] + counts["skipped"]
+
+        with open(job.file_path, 'rb') as f:
+            ingest.ingest_csv(db, f, on_chunk=on_chunk, skip_rows=base_rows, explain=bool(job.explain), dedup=job.dedup or "none",
+                              user_id=job.user_id)
+
+        job.status = "done"
+        job.finished_at = func.now()
+        db.commit()
+        os.remove(job.file_path)
+
+    except Exception as e:
+        traceback.print_exc()
+        db.rollback()
+        job = crud.get_ingest_job(db, job_id)
+        if job:
+            job.status = "failed"
+            job.error = str(e)
+            job.finished_at = func.now()
+            db.commit()
+    finally:
+        db.close()
+
+def submit_rescore(db: Session, model_name: str, model_version: str) -> models.RescoreJob:
+    """Skor ulang semua lead yang belum dari model_version (setelah model baru di-promote)"""
+    job = crud.create_rescore_job(db, model_name=model_name, model_version=model_version)
+    executor.submit(run_rescore, job.id)
+    return job
+
+def run_rescore(job_id: int):
+    db = SessionLocal()
+    try:
+        job = crud.get_rescore_job(db, job_id)
+        if job is None or job.status not in ("queued", "running"):
+            return
+
+        job.status = "running"
+        job.started_at = job.started_at or func.now()
+        if job.rows_total is None:
+            job.rows_total = crud.count_leads_to_rescore(db, job.model_version)
+        db.commit()
+
+        # Lead yang sudah diskor ulang tidak ikut query lagi, jadi job yang di-resume otomatis lanjut
+        base_elapsed = job.elapsed_seconds or 0.0
+        start = time.perf_counter()
+        last_id = 0
+        while True:
+            model = ml_service.current()
+            if model.model_version != job.model_version:
+                # Model aktif sudah diganti lagi, job untuk model yang baru yang melanjutkan
+                job.status = "cancelled"
+                job.error = f"Active model changed to {model.name} ({model.model_version})"
+                break
+
+            leads = crud.get_leads_to_rescore(db, job.model_version, after_id=last_id, limit=RESCORE_BATCH_SIZE)
+            if not leads:
+                job.status = "done"
+                break
+
+            predictions = model.predict_encoded(model.encoder.encode_records(leads))
+            crud.update_lead_predictions_bulk(db, leads, predictions)
+            last_id = leads[-1]["id"]
+
+            job.rows_done = (job.rows_done or 0) + len(leads)
+            job.elapsed_seconds = base_elapsed + time.perf_counter() - start
+            db.commit()
+
+        job.finished_at = func.now()
+        db.commit()
+
+    except Exception as e:
+        traceback.print_exc()
+        db.rollback()
+        job = crud.get_rescore_job(db, job_id)
+        if job:
+            job.status = "failed"
+            job.error = str(e)
+            job.finished_at = func.now()
+            db.commit()
+    finally:
+        db.close()
+
+def rescore_unversioned():
+    """
+    Startup: lead lama tanpa model_version (diskor sebelum registry model & encoder fitur yang sekarang)
+    tidak pernah ikut rescoring otomatis, jadi diskor ulang sekali dengan model aktif.
+    Tidak membuat job baru kalau sudah ada rescoring yang queued/running.
+    """
+    if not ml_service.wait_until_ready():
+        print("⚠️ Model not ready, skipping rescore of leads without model_version")
+        return None
+    db = SessionLocal()
+    try:
+        if crud.get_pending_rescore_jobs(db) or not crud.has_unversioned_leads(db):
+            return None
+        model = ml_service.current()
+        job = submit_rescore(db, model.name, model.model_version)
+        print(f"🔄 Rescoring leads without model_version (job {job.id}, {model.name})")
+        return job.id
+    except Exception:
+        traceback.print_exc()
+        db.rollback()
+    finally:
+        db.close()
+
+def backfill_content_hashes(batch_size: int = RESCORE_BATCH_SIZE):
+    """Isi content_hash untuk lead lama (sebelum ada dedup), supaya upload berikutnya bisa di-dedup"""
+    db = SessionLocal()
+    total = 0
+    try:
+        while True:
+            leads = crud.get_leads_without_content_hash(db, limit=batch_size)
+            if not leads:
+                break
+            crud.set_content_hashes(db, [lead["id"] for lead in leads], ingest.content_hashes(pd.DataFrame(leads)))
+            total += len(leads)
+        if total:
+            print(f"✅ Content hash backfilled for {total} leads")
+    except Exception:
+        traceback.print_exc()
+        db.rollback()
+    finally:
+        db.close()
+    return total
+
+def resume_pending_jobs():
+    """Dipanggil saat startup: job yang queued/running sebelum restart dijalankan lagi"""
+    db = SessionLocal()
+    try:
+        job_ids = [job.id for job in crud.get_pending_ingest_jobs(db)]
+        rescore_ids = [job.id for job in crud.get_pending_rescore_jobs(db)]
+    finally:
+        db.close()
+
+    for job_id in job_ids:
+        executor.submit(run_job, job_id)
+    for job_id in rescore_ids:
+        executor.submit(run_rescore, job_id)
+    return job_ids + rescore_ids
+
+def job_status(job: models.IngestJob) -> dict:
+    rows_done = job.rows_done or 0
+    elapsed = job.elapsed_seconds or 0.0
+    rows_per_sec = rows_done / elapsed if elapsed > 0 else None
+
+    eta_seconds = None
+    if job.status == "done":
+        eta_seconds = 0.0
+    elif rows_per_sec and job.rows_total is not None:
+        eta_seconds = round(max(job.rows_total - rows_done, 0) / rows_per_sec, 1)
+
+    return {
+        "id": job.id,
+        "filename": getattr(job, "filename", None),
+        "rows_inserted": getattr(job, "rows_inserted", None),
+        "rows_updated": getattr(job, "rows_updated", None),
+        "rows_skipped": getattr(job, "rows_skipped", None),
+        "model_name": getattr(job, "model_name", None),
+        "model_version": getattr(job, "model_version", None),
+        "status": job.status,
+        "rows_total": job.rows_total,
+        "rows_done": rows_done,
+        "rows_per_sec": round(rows_per_sec, 1) if rows_per_sec else None,
+        "eta_seconds": eta_seconds,
+        "error": job.error,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at
+    }
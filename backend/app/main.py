@@ -1,29 +1,80 @@
-from fastapi import FastAPI, Depends, HTTPException, UploadFile, File
+from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Query, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from fastapi.security import OAuth2PasswordRequestForm
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import text
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from datetime import datetime
+from contextlib import asynccontextmanager
+import os
+import time
 import pandas as pd
-import io
 
-from . import models, schemas, crud
-from .database import engine, get_db
-from .ml_service import ml_service
+from . import models, schemas, crud, ingest, jobs, stats, export, metrics, activity
+from .database import engine, async_engine, get_db, get_async_db, SessionLocal, add_missing_columns
+from .ml_service import ml_service, ML_LOAD_MODE, prediction_cache, explanation_cache
+from .shadow import shadow_scorer
+from .cpu_pool import cpu_pool
 from . import auth
 
 if __name__ == "__main__":
     import uvicorn
-    import os
     port = int(os.environ.get("PORT", 8000))
     uvicorn.run("app.main:app", host="0.0.0.0", port=port)
 
 # Create Tables
 models.Base.metadata.create_all(bind=engine)
+# create_all tidak menambahkan kolom & index baru ke tabel yang sudah ada (DB lama)
+add_missing_columns(models.Lead.__table__)
+add_missing_columns(models.IngestJob.__table__)
+for index in models.Lead.__table__.indexes:
+    index.create(bind=engine, checkfirst=True)
+# Index filter lama yang sudah dibuang dari models.Lead (memperlambat ingest, lihat benchmarks/bench_lead_filters.py)
+with engine.begin() as conn:
+    for name in ["ix_leads_label_id", "ix_leads_job_id", "ix_leads_job_score_id", "ix_leads_education_id",
+                 "ix_leads_education_score_id", "ix_leads_month_id", "ix_leads_month_score_id"]:
+        conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Mode background: server langsung bisa jawab health check, model dimuat di thread terpisah
+    if ML_LOAD_MODE == "background":
+        ml_service.load_in_background()
+    ml_service.start_watcher()
+    # Proses CPU pool (scoring & SHAP) dinyalakan sekarang supaya request pertama tidak menunggu spawn
+    if cpu_pool.enabled:
+        cpu_pool.start([ml_service.active.spec])
+
+    # Tugas startup sekali jalan. Mode pre-fork (gunicorn.conf.py): hanya worker pertama yang
+    # menjalankannya (STARTUP_TASKS=false di worker lain), supaya job tidak di-resume dua kali
+    if os.getenv("STARTUP_TASKS", "true").lower() == "true":
+        # Bangun ringkasan dashboard kalau DB lama belum punya
+        db = SessionLocal()
+        try:
+            stats.ensure_built(db)
+            activity.ensure_built(db)
+        finally:
+            db.close()
+
+        # Lanjutkan upload yang belum selesai sebelum server restart
+        jobs.resume_pending_jobs()
+        # Lead lama belum punya content_hash (untuk dedup), diisi di background
+        jobs.executor.submit(jobs.backfill_content_hashes)
+        # Lead lama tanpa model_version diskor ulang sekali dengan model aktif
+        jobs.executor.submit(jobs.rescore_unversioned)
+    yield
+
+    cpu_pool.shutdown()
+    if async_engine is not None:
+        await async_engine.dispose()
 
 app = FastAPI(
     title="SmartConvert CRM API",
     description="Backend API with Batch Upload & Prediction Capability",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # --- KONFIGURASI CORS (PENTING BUAT REACT) ---
@@ -38,59 +89,104 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],        # Izinkan semua method (GET, POST, dll)
     allow_headers=["*"],        # Izinkan semua header
+    expose_headers=["X-Next-Cursor", "X-Total-Count"], # Supaya frontend bisa baca cursor pagination & total
 )
+# Latency & jumlah query DB per route untuk /metrics (+ profiler request lambat kalau PROFILE_ENABLED=true)
+app.add_middleware(metrics.MetricsMiddleware)
 # ---------------------------------------------
 
+# AUTH_REQUIRED=true: route dengan dependencies=AUTH butuh token (user dari cache token, lihat
+# auth.get_current_user). Kalau false dependency-nya tidak dipasang sama sekali, jadi tidak ada overhead.
+AUTH = [Depends(auth.get_current_user)] if auth.AUTH_REQUIRED else []
+# Route admin / yang mengubah state server (model, cache, ringkasan dashboard) selalu butuh token,
+# apa pun nilai AUTH_REQUIRED
+ADMIN = [Depends(auth.get_current_user)]
+
 @app.get("/")
 def read_root():
     return {"message": "SmartConvert API is running 🚀"}
 
+# Readiness: 503 sampai model & fitur selesai dimuat (untuk load balancer / autoscaler)
+@app.get("/api/v1/ready")
+def read_ready():
+    if not ml_service.ready.is_set():
+        raise HTTPException(status_code=503, detail="Model is still loading")
+    return {
+        "status": "ready",
+        "model_loaded": ml_service.model is not None,
+        "model_name": ml_service.model_name,
+        "explainer_loaded": ml_service.explainer is not None,
+        "model_version": ml_service.model_version,
+        "load_seconds": round(ml_service.load_seconds, 3) if ml_service.load_seconds is not None else None
+    }
+
+# Statistik cache hasil predict / SHAP (hit, miss, eviction)
+@app.get("/api/v1/cache/stats")
+def read_cache_stats():
+    return {
+        "predictions": prediction_cache.stats(),
+        "explanations": explanation_cache.stats(),
+        "tokens": auth.token_cache.stats()
+    }
+
+# Metrik format Prometheus (per proses worker): latency per route, query DB per request,
+# tahap ingest (parse/encode/predict/insert/...), dan waktu panggilan model
+@app.get("/metrics", response_class=PlainTextResponse)
+def read_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.delete("/api/v1/cache", dependencies=ADMIN)
+def clear_cache():
+    prediction_cache.clear()
+    explanation_cache.clear()
+    return {"status": "success", "message": "Prediction cache cleared"}
+
+# Route lead, dashboard & job berbentuk async: query lewat db.run_sync (AsyncSession kalau
+# ASYNC_DB_ENABLED=true, selain itu Session biasa di threadpool), parse CSV / predict / SHAP di
+# threadpool atau CPU pool. Tidak ada I/O atau kerja CPU berat yang jalan langsung di event loop.
+
 # --- 1. Endpoint Upload CSV (Batch Processing) ---
-@app.post("/api/v1/upload-csv")
-async def upload_leads_csv(file: UploadFile = File(...), db: Session = Depends(get_db)):
+@app.post("/api/v1/upload-csv", dependencies=AUTH)
+async def upload_leads_csv(
+    file: UploadFile = File(...),
+    run_async: bool = Query(False, alias="async"), # ?async=true -> jadi background job
+    explain: bool = False, # ?explain=true -> SHAP dihitung sekalian saat ingest
+    dedup: str = "none", # ?dedup=skip / update -> baris yang sudah ada tidak di-insert lagi
+    db: Session = Depends(get_db),
+    user_id: Optional[int] = Depends(auth.get_current_user_id) # Untuk activity log
+):
     if not file.filename.endswith('.csv'):
         raise HTTPException(status_code=400, detail="File must be a CSV")
+    if dedup not in ingest.DEDUP_MODES:
+        raise HTTPException(status_code=400, detail=f"dedup must be one of {', '.join(ingest.DEDUP_MODES)}")
 
     try:
-        contents = await file.read()
-        try:
-            df = pd.read_csv(io.StringIO(contents.decode('utf-8')), sep=';')
-            if df.shape[1] < 2:
-                 df = pd.read_csv(io.StringIO(contents.decode('utf-8')), sep=',')
-        except:
-             df = pd.read_csv(io.StringIO(contents.decode('utf-8')), sep=',')
-
-        # --- PERBAIKAN DI SINI ---
-        # JANGAN ubah df.columns secara global agar ML tetap dapat nama kolom asli (pakai titik)
-        # df.columns = [c.replace('.', '_') for c in df.columns] <--- HAPUS BARIS INI
-        
-        results = []
-        for index, row in df.iterrows():
-            lead_data_raw = row.to_dict() # Ini masih pakai titik (emp.var.rate), BAGUS UNTUK ML
-            
-            # 1. Prediksi pakai data RAW (sesuai JSON features)
-            prediction = ml_service.predict(lead_data_raw)
-            
-            # 2. Siapkan data untuk Database (Ganti titik jadi underscore HANYA DISINI)
-            lead_data_for_db = {}
-            valid_db_columns = models.Lead.__table__.columns.keys()
-            
-            for k, v in lead_data_raw.items():
-                # Ubah key misal 'emp.var.rate' jadi 'emp_var_rate'
-                clean_key = k.replace('.', '_')
-                
-                # Masukkan hanya jika kolomnya ada di tabel Database
-                if clean_key in valid_db_columns:
-                    lead_data_for_db[clean_key] = v
-            
-            # 3. Simpan
-            saved_lead = crud.create_lead(db, lead_data_for_db, prediction)
-            results.append(saved_lead)
+        if run_async:
+            # File disimpan ke disk lalu diproses worker, progress dicek via /api/v1/jobs/{id}
+            job = await run_in_threadpool(jobs.submit_upload, db, file, explain, dedup, user_id)
+            return {
+                "status": "queued",
+                "message": f"Upload queued as job {job.id}",
+                "job_id": job.id
+            }
+
+        # Streaming: file dibaca per chunk (parse -> score -> insert) di threadpool,
+        # jadi event loop tidak ke-block dan memori tidak tergantung ukuran file
+        result = await run_in_threadpool(ingest.ingest_csv, db, file.file, explain=explain, dedup=dedup, user_id=user_id)
+        elapsed_seconds, scoring_seconds = result["elapsed_seconds"], result["scoring_seconds"]
+        sample_data = await run_in_threadpool(crud.get_leads_by_ids, db, result["sample_ids"])
 
         return {
             "status": "success", 
-            "message": f"Successfully processed {len(results)} leads",
-            "sample_data": results[:5] 
+            "message": f"Successfully processed {result['rows']} leads",
+            "inserted": result["inserted"],
+            "updated": result["updated"],
+            "skipped": result["skipped"],
+            # End-to-end (parse sampai commit); scoring_rows_per_sec hanya encode + predict
+            "rows_per_sec": round(result["rows"] / elapsed_seconds, 1) if elapsed_seconds > 0 else None,
+            "scoring_rows_per_sec": round(result["rows"] / scoring_seconds, 1) if scoring_seconds > 0 else None,
+            "stage_seconds": result["stage_seconds"], # Rincian waktu per tahap (parse, encode, predict, insert, ...)
+            "sample_data": sample_data
         }
 
     except Exception as e:
@@ -98,80 +194,243 @@ async def upload_leads_csv(file: UploadFile = File(...), db: Session = Depends(g
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Error processing CSV: {str(e)}")
 
+# --- 1b. Endpoint Status Background Upload Job ---
+@app.get("/api/v1/jobs/{job_id}", response_model=schemas.IngestJobResponse, dependencies=AUTH)
+async def read_job(job_id: int, db = Depends(get_async_db)):
+    job = await db.run_sync(crud.get_ingest_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return jobs.job_status(job)
+
+# --- 1c. Endpoint Model Registry (hot reload & promote tanpa restart) ---
+@app.get("/api/v1/models", dependencies=AUTH)
+def read_models():
+    ml_service.wait_until_ready()
+    return ml_service.list_models()
+
+@app.post("/api/v1/models/reload", dependencies=ADMIN)
+def reload_models():
+    # Baca ulang ml_assets/registry.json, model yang baru / berubah dimuat
+    try:
+        return ml_service.reload()
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error reloading registry: {str(e)}")
+
+@app.post("/api/v1/models/{name}/promote", dependencies=ADMIN)
+def promote_model(name: str, rescore: bool = True, db: Session = Depends(get_db)):
+    ml_service.wait_until_ready()
+    try:
+        model = ml_service.promote(name)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Model not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    result = {"status": "success", "active": model.info()}
+    if rescore:
+        # Lead lama diskor ulang di background, progress dicek via /api/v1/rescore-jobs/{id}
+        result["rescore_job_id"] = jobs.submit_rescore(db, model.name, model.model_version).id
+    return result
+
+# Shadow scoring: model kandidat ikut menskor lead baru di background untuk dibandingkan
+@app.post("/api/v1/models/{name}/shadow", dependencies=ADMIN)
+def set_shadow_model(name: str):
+    ml_service.wait_until_ready()
+    try:
+        model = ml_service.set_shadow(name)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Model not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "success", "shadow": model.info()}
+
+@app.delete("/api/v1/models/shadow", dependencies=ADMIN)
+def disable_shadow_model():
+    ml_service.set_shadow(None)
+    return {"status": "success", "shadow": None}
+
+@app.get("/api/v1/models/shadow/report", dependencies=AUTH)
+def read_shadow_report(window: int = 1000, db: Session = Depends(get_db)):
+    report = shadow_scorer.report(db, window=window)
+    if report is None:
+        raise HTTPException(status_code=404, detail="No shadow model configured")
+    return report
+
+@app.get("/api/v1/rescore-jobs/{job_id}", response_model=schemas.RescoreJobResponse, dependencies=AUTH)
+def read_rescore_job(job_id: int, db: Session = Depends(get_db)):
+    job = crud.get_rescore_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return jobs.job_status(job)
+
 # --- 2. Endpoint Get Leads (List Data) ---
 # Ubah endpoint /api/v1/leads menjadi:
-@app.get("/api/v1/leads", response_model=List[schemas.LeadResponse])
-def read_leads(
+@app.get("/api/v1/leads", response_model=List[schemas.LeadResponse], dependencies=AUTH)
+async def read_leads(
+    response: Response,
     skip: int = 0, 
     limit: int = 100, 
     sort_by: str = "newest", # Parameter baru
-    db: Session = Depends(get_db)
+    after: Optional[str] = None, # Cursor dari header X-Next-Cursor halaman sebelumnya
+    label: Optional[str] = None, # mis. "High Potential"
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+    job: Optional[str] = None,
+    education: Optional[str] = None,
+    month: Optional[str] = None, # mis. "may"
+    created_from: Optional[datetime] = None, # created_at >= created_from
+    created_to: Optional[datetime] = None, # created_at < created_to
+    db = Depends(get_async_db)
 ):
-    leads = crud.get_leads(db, skip=skip, limit=limit, sort_by=sort_by)
+    filters = {
+        "label": label, "min_score": min_score, "max_score": max_score,
+        "job": job, "education": education, "month": month,
+        "created_from": created_from, "created_to": created_to
+    }
+    try:
+        leads = await db.run_sync(crud.get_leads, skip=skip, limit=limit, sort_by=sort_by, after=after, **filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Cursor halaman berikutnya & total (sesuai filter) dikirim lewat header supaya body tetap list seperti sebelumnya
+    if leads and len(leads) == limit:
+        response.headers["X-Next-Cursor"] = crud.encode_cursor(leads[-1], sort_by)
+    response.headers["X-Total-Count"] = str(await db.run_sync(crud.count_leads, **filters))
     return leads
 
+# --- 2a. Endpoint Export Leads (CSV / Parquet / Arrow) ---
+# Di-stream per chunk dari cursor DB (di threadpool), jadi 1 juta lead tidak pernah ada utuh di memori.
+# Harus didaftarkan sebelum /api/v1/leads/{lead_id}
+@app.get("/api/v1/leads/export", dependencies=AUTH)
+def export_leads(
+    export_format: str = Query("csv", alias="format"), # csv / parquet / arrow
+    label: Optional[str] = None, # mis. "High Potential"
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+    job: Optional[str] = None,
+    education: Optional[str] = None,
+    month: Optional[str] = None,
+    created_from: Optional[datetime] = None, # created_at >= created_from
+    created_to: Optional[datetime] = None # created_at < created_to
+):
+    try:
+        export.check_format(export_format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    filters = {
+        "label": label, "min_score": min_score, "max_score": max_score,
+        "job": job, "education": education, "month": month,
+        "created_from": created_from, "created_to": created_to
+    }
+    media_type, extension = export.EXPORT_FORMATS[export_format]
+    return StreamingResponse(
+        export.stream_leads(export_format, filters),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="leads_export.{extension}"'}
+    )
+
+# --- 2b. Endpoint Tambah Satu Lead (Real-time Scoring) ---
+# Predict jalan di threadpool: request yang datang bersamaan digabung
+# jadi satu predict oleh micro-batcher kalau MICROBATCH_ENABLED=true
+def score_lead(lead_data: dict):
+    lead_data["content_hash"] = ingest.content_hashes(pd.DataFrame([lead_data]))[0]
+    start = time.perf_counter()
+    prediction = ml_service.predict(lead_data)
+    return prediction, time.perf_counter() - start
+
+@app.post("/api/v1/leads", response_model=schemas.LeadResponse, dependencies=AUTH)
+async def create_lead(lead: schemas.LeadCreate, db = Depends(get_async_db), user_id: Optional[int] = Depends(auth.get_current_user_id)):
+    lead_data = lead.model_dump()
+    prediction, predict_seconds = await run_in_threadpool(score_lead, lead_data)
+    if "error" in prediction:
+        raise HTTPException(status_code=503, detail=f"Prediction failed: {prediction['error']}")
+
+    db_lead = await db.run_sync(crud.create_lead, lead_data, prediction, user_id)
+    shadow_scorer.submit([db_lead.id], [lead_data], [prediction], predict_seconds)
+    return db_lead
+
 # --- 3. Endpoint Dashboard Stats (BI Logic) ---
-@app.get("/api/v1/dashboard/stats", response_model=schemas.DashboardStats)
-def read_stats(db: Session = Depends(get_db)):
-    return crud.get_dashboard_stats(db)
+@app.get("/api/v1/dashboard/stats", response_model=schemas.DashboardStats, dependencies=AUTH)
+async def read_stats(db = Depends(get_async_db)):
+    if stats.DASHBOARD_STATS_ENGINE == "single_pass":
+        return await db.run_sync(stats.compute_single_pass)
+    elif stats.DASHBOARD_STATS_ENGINE == "multi_query":
+        return await db.run_sync(crud.get_dashboard_stats)
+    # Default: dibaca dari ringkasan yang di-maintain saat insert, bukan full scan tabel leads
+    return await db.run_sync(stats.get_dashboard_stats)
+
+@app.post("/api/v1/dashboard/stats/rebuild", dependencies=ADMIN)
+def rebuild_stats(db: Session = Depends(get_db)):
+    stats.rebuild(db)
+    return {"status": "success", "message": "Dashboard stats rebuilt"}
 
 # --- 4. Endpoint Detail Lead (XAI Placeholder) ---
-@app.get("/api/v1/leads/{lead_id}", response_model=schemas.LeadResponse)
-def read_lead(lead_id: int, db: Session = Depends(get_db)):
+@app.get("/api/v1/leads/{lead_id}", response_model=schemas.LeadResponse, dependencies=AUTH)
+async def read_lead(lead_id: int, db = Depends(get_async_db)):
     # 1. Ambil data dari Database
-    db_lead = crud.get_lead_by_id(db, lead_id=lead_id)
+    db_lead = await db.run_sync(crud.get_lead_by_id, lead_id=lead_id)
     if db_lead is None:
         raise HTTPException(status_code=404, detail="Lead not found")
     
-    # 2. Konversi object Database ke Dictionary
-    lead_dict = db_lead.__dict__.copy()
+    # 2. Pakai penjelasan SHAP dari cache kalau versi modelnya masih sama
+    if not ml_service.ready.is_set():
+        await run_in_threadpool(ml_service.wait_until_ready)
+    model = ml_service.active
+    explanation = await db.run_sync(crud.get_lead_explanation, lead_id, model.model_version)
     
-    # 3. Hitung Penjelasan SHAP secara Real-time
-    # Kita harus memfilter key yang bukan fitur (seperti id, created_at, prediction_score)
-    # Cara gampangnya: kita kirim lead_dict, nanti ml_service yang filter via preprocess
-    explanation = ml_service.explain_prediction(lead_dict)
+    if explanation is None:
+        # 3. Belum ada di cache: hitung SHAP sekali (di threadpool / CPU pool), lalu simpan
+        # Kita kirim lead_dict, nanti ml_service yang filter kolom non-fitur via preprocess
+        lead_dict = db_lead.__dict__.copy()
+        explanation = await run_in_threadpool(model.explain_prediction, lead_dict)
+        if explanation is not None:
+            await db.run_sync(crud.save_lead_explanation, lead_id, model.model_version, explanation)
     
     # 4. Tempelkan hasil penjelasan ke respons
-    # (Kita tidak simpan ke DB biar hemat storage, hitung on-the-fly aja)
     db_lead.explanation = explanation
     
     return db_lead
 
-@app.get("/api/v1/user/profile")
-def read_user_profile(db: Session = Depends(get_db)):
-    return crud.get_user_profile(db)
+@app.get("/api/v1/user/profile", dependencies=AUTH)
+def read_user_profile(db: Session = Depends(get_db), user_id: Optional[int] = Depends(auth.get_current_user_id)):
+    # Login: performa & aktivitas user itu sendiri, tanpa login: semua aktivitas
+    return crud.get_user_profile(db, user_id)
 
-@app.put("/api/v1/user/profile")
-def update_profile(data: dict, db: Session = Depends(get_db)):
-    return crud.update_user_profile(db, data)
+@app.put("/api/v1/user/profile", dependencies=AUTH)
+def update_profile(data: dict, db: Session = Depends(get_db), user_id: Optional[int] = Depends(auth.get_current_user_id)):
+    return crud.update_user_profile(db, data, user_id)
 
-@app.put("/api/v1/leads/{lead_id}/notes")
-def update_lead_notes(lead_id: int, notes_data: dict, db: Session = Depends(get_db)):
-    db_lead = crud.get_lead_by_id(db, lead_id=lead_id)
+@app.put("/api/v1/leads/{lead_id}/notes", dependencies=AUTH)
+async def update_lead_notes(lead_id: int, notes_data: dict, db = Depends(get_async_db), user_id: Optional[int] = Depends(auth.get_current_user_id)):
+    db_lead = await db.run_sync(crud.update_lead_notes, lead_id, notes_data.get("notes"), user_id)
     if not db_lead:
         raise HTTPException(status_code=404, detail="Lead not found")
-    
-    db_lead.notes = notes_data.get("notes")
-    db.commit()
     return {"status": "success", "message": "Note saved"}
 
 # Ini untuk mendeteksi token di header
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/login")
+oauth2_scheme = auth.oauth2_scheme
 
-# 1. Endpoint REGISTER
+# 1. Endpoint REGISTER (bcrypt di executor sendiri, bukan di thread request)
 @app.post("/api/v1/register")
-def register_user(user_data: dict, db: Session = Depends(get_db)):
-    existing_user = crud.get_user_by_username(db, username=user_data['username'])
+async def register_user(user_data: dict, db = Depends(get_async_db)):
+    existing_user = await db.run_sync(crud.get_user_by_username, username=user_data['username'])
     if existing_user:
         raise HTTPException(status_code=400, detail="Username already registered")
-    return crud.create_user(db, user_data)
+    hashed_password = await auth.get_password_hash_async(user_data['password'])
+    return await db.run_sync(crud.create_user, user_data, hashed_password)
 
 # 2. Endpoint LOGIN (Menghasilkan Token)
 @app.post("/api/v1/login")
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = crud.get_user_by_username(db, username=form_data.username)
-    if not user or not auth.verify_password(form_data.password, user.hashed_password):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db = Depends(get_async_db)):
+    user = await db.run_sync(crud.get_user_by_username, username=form_data.username)
+    if not user or not await auth.verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Incorrect username or password")
     
     access_token = auth.create_access_token(data={"sub": user.username})
-    return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
+    return {"access_token": access_token, "token_type": "bearer"}
+
+# 3. Endpoint user yang sedang login (selalu butuh token)
+@app.get("/api/v1/me", response_model=schemas.CurrentUser)
+async def read_current_user(current_user: schemas.CurrentUser = Depends(auth.get_current_user)):
+    return current_user
\ No newline at end of file
@@ -0,0 +1,268 @@
+import bisect
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter as FrameCounter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+
+# Metrik Prometheus di /metrics (histogram latency per route, tahap ingest, panggilan model, query DB per request)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+# Profiler sampling untuk request lambat (opt-in). Request diprofil dengan peluang PROFILE_SAMPLE_RATE
+# (atau kalau ada header X-Profile), hasilnya disimpan ke PROFILE_DIR hanya kalau durasinya >= PROFILE_SLOW_MS.
+PROFILE_ENABLED = os.getenv("PROFILE_ENABLED", "false").lower() == "true"
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 1.0))
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", 500))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", 5))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "./profiles")
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 500)
+
+# Semua metrik yang dibuat, urut sesuai definisi (urutan output /metrics)
+REGISTRY = []
+
+def escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_label(value)}"' for name, value in labels.items()) + "}"
+
+def format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {} # tuple nilai label -> state
+        self.lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def key(self, labels: dict) -> tuple:
+        return tuple(labels[name] for name in self.labelnames)
+
+    def samples(self):
+        """(nama sample, dict label, nilai)"""
+        return []
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+        return lines
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self):
+        with self.lock:
+            values = list(self.values.items())
+        for key, value in values:
+            yield f"{self.name}_total", dict(zip(self.labelnames, key)), value
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = self.key(labels)
+        index = bisect.bisect_left(self.buckets, value) # Bucket pertama dengan le >= value
+        with self.lock:
+            state = self.values.get(key)
+            if state is None:
+                # [jumlah per bucket (tidak kumulatif, +1 untuk +Inf), sum, count]
+                state = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        with self.lock:
+            values = [(key, list(state[0]), state[1], state[2]) for key, state in self.values.items()]
+        for key, counts, total, count in values:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for le, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket", {**labels, "le": format_value(le)}, cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, count
+
+def render() -> str:
+    """Semua metrik dalam format teks Prometheus (exposition format 0.0.4)"""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+# --- Metrik aplikasi ---
+REQUEST_SECONDS = Histogram("http_request_duration_seconds", "HTTP request latency per route", ("method", "route", "status"))
+REQUEST_DB_QUERIES = Histogram("http_request_db_queries", "SQL statements executed per HTTP request", ("method", "route"), QUERY_COUNT_BUCKETS)
+INGEST_STAGE_SECONDS = Histogram("ingest_stage_seconds", "Time per CSV ingest stage per chunk", ("stage",))
+INGEST_ROWS = Counter("ingest_rows", "CSV rows processed by ingest", ("result",))
+# call = nama method LoadedModel; run_scores / run_explanations = model & SHAP sendiri (hanya baris yang miss cache)
+ML_CALL_SECONDS = Histogram("ml_call_seconds", "Time per LoadedModel call", ("model", "call"))
+ML_ROWS = Counter("ml_rows", "Rows scored / explained by the model itself (prediction cache misses)", ("model", "call"))
+
+class StageTimer:
+    """Waktu per tahap satu pipeline (mis. satu upload): diakumulasi per tahap + tiap potongan masuk histogram"""
+    def __init__(self, histogram: Histogram = INGEST_STAGE_SECONDS):
+        self.histogram = histogram
+        self.seconds = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.seconds[name] = self.seconds.get(name, 0.0) + elapsed
+            self.histogram.observe(elapsed, stage=name)
+
+    def summary(self) -> dict:
+        return {name: round(seconds, 4) for name, seconds in self.seconds.items()}
+
+# --- Jumlah query DB per request ---
+# List [jumlah] milik request yang sedang jalan. Context ikut disalin ke threadpool & greenlet AsyncSession,
+# list-nya sama (mutable), jadi query dari thread mana pun tetap terhitung ke request ini.
+request_queries = ContextVar("request_queries", default=None)
+
+def count_query(conn, cursor, statement, parameters, context, executemany):
+    counter = request_queries.get()
+    if counter is not None:
+        counter[0] += 1
+
+# --- Profiler sampling ---
+# Frame paling dalam thread yang sedang menganggur (menunggu kerja / I/O), tidak ikut di-sample
+IDLE_FRAMES = {("threading.py", "wait"), ("queue.py", "get"), ("selectors.py", "select"), ("thread.py", "_worker")}
+
+class SamplingProfiler:
+    """
+    Profiler sampling sederhana (tanpa dependency): thread terpisah mengambil stack semua thread
+    (sys._current_frames) tiap PROFILE_INTERVAL_MS selama request berjalan. Semua thread yang sibuk
+    ikut di-sample, karena kerja request bisa jalan di threadpool / thread ingest (proses CPU pool tidak
+    ikut di-sample); di server
+    yang ramai hasilnya bisa tercampur request lain. Hanya satu request yang diprofil dalam satu waktu.
+    Output format "folded" (stack;stack;... jumlah_sample), bisa dibuka di speedscope / flamegraph.pl.
+    """
+    active_lock = threading.Lock()
+
+    def __init__(self, forced: bool = False, interval_ms: float = PROFILE_INTERVAL_MS):
+        self.forced = forced # Diminta lewat header X-Profile: selalu disimpan, walaupun tidak lambat
+        self.interval = interval_ms / 1000
+        self.stacks = FrameCounter()
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="request-profiler", daemon=True)
+
+    @classmethod
+    def maybe_start(cls, scope: dict):
+        if not PROFILE_ENABLED:
+            return None
+        forced = any(name == b"x-profile" for name, _ in scope.get("headers", ()))
+        if not forced and random.random() >= PROFILE_SAMPLE_RATE:
+            return None
+        if not cls.active_lock.acquire(blocking=False):
+            return None # Sedang memprofil request lain
+        profiler = cls(forced)
+        profiler.thread.start()
+        return profiler
+
+    def run(self):
+        own = threading.get_ident()
+        while not self.stop_event.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                if (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in IDLE_FRAMES:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(f"{frame.f_code.co_name} ({os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self, method: str, route: str, elapsed: float):
+        self.stop_event.set()
+        self.thread.join()
+        SamplingProfiler.active_lock.release()
+        elapsed_ms = elapsed * 1000
+        if not self.stacks or (elapsed_ms < PROFILE_SLOW_MS and not self.forced):
+            return None
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+        path = os.path.join(PROFILE_DIR, f"{datetime.now():%Y%m%d_%H%M%S_%f}_{method}_{slug}_{elapsed_ms:.0f}ms.folded")
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        print(f"⚠️ Slow request {method} {route} ({elapsed_ms:.0f} ms), profile saved to {path}")
+        return path
+
+# --- Middleware ASGI ---
+def route_template(scope: dict) -> str:
+    # Template route ("/api/v1/leads/{lead_id}"), bukan path asli, supaya jumlah label tidak meledak
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+class MetricsMiddleware:
+    """Latency & jumlah query DB per route (+ profiler opsional). ASGI murni, jadi response streaming tetap streaming."""
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not (METRICS_ENABLED or PROFILE_ENABLED):
+            return await self.app(scope, receive, send)
+
+        status = [500] # Kalau app raise sebelum response dikirim
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        queries = [0]
+        token = request_queries.set(queries)
+        profiler = SamplingProfiler.maybe_start(scope)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            request_queries.reset(token)
+            method, route = scope["method"], route_template(scope)
+            REQUEST_SECONDS.observe(elapsed, method=method, route=route, status=str(status[0]))
+            REQUEST_DB_QUERIES.observe(queries[0], method=method, route=route)
+            if profiler is not None:
+                profiler.stop(method, route, elapsed)
@@ -0,0 +1,70 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+import numpy as np
+
+class MicroBatcher:
+    """
+    Kumpulkan request satu-lead dari banyak thread jadi satu panggilan matriks.
+    Antrian ditunggu paling lama max_wait_ms sejak item pertama masuk, atau sampai
+    max_batch_size item, lalu fn(X) dipanggil sekali untuk semuanya.
+    """
+    def __init__(self, fn, max_batch_size: int = 64, max_wait_ms: float = 2.0, name: str = "microbatch", idle_timeout: float = 30.0):
+        self.fn = fn # fn(X: np.ndarray) -> list hasil, satu per baris
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.idle_timeout = idle_timeout # Thread berhenti kalau tidak ada request selama ini (dinyalakan lagi saat submit)
+        self.name = name
+        self.queue = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+
+        # Statistik sederhana untuk tuning batch size vs latency
+        self.batches = 0
+        self.items = 0
+
+    def submit(self, row: np.ndarray) -> Future:
+        """row: satu baris fitur yang sudah di-encode (1D). Hasilnya diambil lewat future.result()"""
+        future = Future()
+        self.queue.put((row, future))
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name=self.name, daemon=True)
+                self.thread.start()
+        return future
+
+    def run(self):
+        while True:
+            try:
+                items = [self.queue.get(timeout=self.idle_timeout)]
+            except queue.Empty:
+                with self.lock:
+                    # Cek ulang di dalam lock: submit() yang masuk barusan akan melihat thread masih jalan
+                    if self.queue.empty():
+                        self.thread = None
+                        return
+                continue
+            deadline = time.perf_counter() + self.max_wait
+            while len(items) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    items.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                results = self.fn(np.stack([row for row, _ in items]))
+                for (_, future), result in zip(items, results):
+                    future.set_result(result)
+            except Exception as e:
+                for _, future in items:
+                    future.set_exception(e)
+
+            self.batches += 1
+            self.items += len(items)
+
+    def mean_batch_size(self) -> float:
+        return self.items / self.batches if self.batches else 0.0
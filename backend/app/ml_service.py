@@ -2,133 +2,561 @@ import pandas as pd
 import pickle
 import json
 import os
-import shap # Pastikan library shap terinstall
+import hashlib
+import threading
+import time
 import numpy as np
+from .cpu_pool import cpu_pool
+from .feature_encoder import FeatureEncoder
+from .metrics import ML_CALL_SECONDS, ML_ROWS
+from .microbatch import MicroBatcher
+from .prediction_cache import PredictionCache
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 MODEL_PATH = os.path.join(BASE_DIR, "../ml_assets/xgboost_tuned_v2.pkl")
+BOOSTER_PATH = os.path.join(BASE_DIR, "../ml_assets/xgboost_tuned_v2.ubj") # Hasil python -m app.convert_model
 FEATURES_PATH = os.path.join(BASE_DIR, "../ml_assets/model_features.json")
 
-class MLService:
-    def __init__(self):
+# Registry model di ml_assets/: daftar model (+ manifest fitur masing-masing) dan model yang aktif.
+# Kalau file ini tidak ada, registry berisi satu model default dari path di atas.
+REGISTRY_PATH = os.getenv("ML_REGISTRY_PATH", os.path.join(BASE_DIR, "../ml_assets/registry.json"))
+DEFAULT_MODEL_NAME = "xgboost_tuned_v2"
+# > 0: registry.json dicek tiap N detik, kalau berubah model di-reload tanpa restart
+ML_REGISTRY_POLL_SECONDS = float(os.getenv("ML_REGISTRY_POLL_SECONDS", 0))
+
+# "sklearn": model pickle + predict_proba (perilaku lama)
+# "booster": xgboost.Booster native (path "booster" di registry / BOOSTER_PATH) + inplace_predict pada array NumPy
+ML_BACKEND = os.getenv("ML_BACKEND", "sklearn")
+# Jumlah thread XGBoost per proses (0 = default XGBoost, semua core)
+XGB_NTHREAD = int(os.getenv("XGB_NTHREAD", 0))
+
+# Micro-batching predict/explain satu-lead dari request yang datang bersamaan.
+# MAX_WAIT_MS lebih besar = batch lebih besar (throughput naik), tapi latency per request ikut naik.
+MICROBATCH_ENABLED = os.getenv("MICROBATCH_ENABLED", "false").lower() == "true"
+MICROBATCH_MAX_SIZE = int(os.getenv("MICROBATCH_MAX_SIZE", 64))
+MICROBATCH_MAX_WAIT_MS = float(os.getenv("MICROBATCH_MAX_WAIT_MS", 2))
+
+# Cache hasil predict / SHAP per vektor fitur (0 = mati). TTL dalam detik (0 = tanpa kadaluarsa)
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", 50000))
+EXPLANATION_CACHE_SIZE = int(os.getenv("EXPLANATION_CACHE_SIZE", 10000))
+PREDICTION_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", 3600))
+
+# "eager": model + SHAP dimuat saat import (perilaku lama)
+# "background": server langsung jalan, model dimuat di thread terpisah (cek /api/v1/ready),
+#               shap baru di-import saat penjelasan pertama diminta
+ML_LOAD_MODE = os.getenv("ML_LOAD_MODE", "eager")
+# Berapa lama request yang butuh model menunggu model selesai dimuat
+ML_READY_TIMEOUT = float(os.getenv("ML_READY_TIMEOUT", 60))
+
+# Penjelasan SHAP: hanya fitur dengan |impact| di atas ambang ini yang ditampilkan
+SHAP_IMPACT_THRESHOLD = 0.05
+DEFAULT_RECOMMENDATION = "Gali kebutuhan nasabah secara umum."
+
+def score_to_label(probability: float) -> str:
+    return "High Potential" if probability > 0.7 else "Medium Potential" if probability > 0.3 else "Low Potential"
+
+def recommend_for_feature(top_feature: str) -> str:
+    # Generate Simple Insight / Script (Next Best Conversation)
+    if "nr_employed" in top_feature or "euribor" in top_feature:
+        return "Buka percakapan dengan membahas kondisi ekonomi yang sedang stabil/bagus untuk investasi."
+    elif "pernah_dihubungi" in top_feature:
+        return "Sebutkan bahwa kita pernah menghubungi beliau sebelumnya dan ada penawaran baru."
+    elif "age" in top_feature:
+        return "Sesuaikan nada bicara dengan usia nasabah (pensiunan vs pekerja aktif)."
+    return DEFAULT_RECOMMENDATION
+
+# Dipakai bersama oleh semua model, kuncinya sudah diawali model_version
+prediction_cache = PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL, name="predictions")
+explanation_cache = PredictionCache(EXPLANATION_CACHE_SIZE, PREDICTION_CACHE_TTL, name="explanations")
+
+class LoadedModel:
+    """
+    Satu model dari registry beserta manifest fiturnya, encoder, explainer dan batcher-nya.
+    Semua state per model ada di sini, jadi ganti model = ganti satu referensi (atomic);
+    request yang sedang jalan tetap selesai dengan objek model lamanya.
+    """
+    def __init__(self, name: str, entry: dict):
+        self.name = name
+        self.features_path = entry["features"]
+        # ML_BACKEND=booster pakai file native kalau ada, selain itu backend ditentukan dari ekstensi file
+        if ML_BACKEND == "booster" and entry.get("booster"):
+            self.model_path = entry["booster"]
+        else:
+            self.model_path = entry["model"]
+        self.backend = "sklearn" if self.model_path.endswith(".pkl") else "booster"
+
         self.model = None
+        self.iteration_range = (0, 0)
         self.explainer = None # Siapkan tempat untuk SHAP Explainer
         self.EXPECTED_COLUMNS = []
-        
-        self.load_model()
-        self.load_features()
-        self.init_explainer() # Inisialisasi explainer
+        self.encoder = FeatureEncoder([])
+        self.recommendations = np.array([DEFAULT_RECOMMENDATION], dtype=object)
+        # Hash model + daftar fitur (kunci cache penjelasan SHAP & versi yang dicap di leads)
+        self.model_version = self.compute_model_version()
+        # Cukup untuk memuat model yang sama di proses CPU pool
+        self.spec = (name, {"model": self.model_path, "features": self.features_path}, self.model_version)
+
+        self.explainer_lock = threading.Lock()
+        self.load_seconds = None
+
+        self.score_batcher = MicroBatcher(self.predict_encoded, MICROBATCH_MAX_SIZE, MICROBATCH_MAX_WAIT_MS, name=f"score-batcher-{name}")
+        self.explain_batcher = MicroBatcher(self.explain_batch, MICROBATCH_MAX_SIZE, MICROBATCH_MAX_WAIT_MS, name=f"explain-batcher-{name}")
+
+    def load(self):
+        start = time.perf_counter()
+        try:
+            self.load_model()
+            self.load_features()
+        finally:
+            self.load_seconds = time.perf_counter() - start
+        return self
+
+    def get_explainer(self):
+        """SHAP Explainer dibuat saat pertama kali dibutuhkan (import shap itu berat)"""
+        if self.explainer is None and self.model is not None:
+            with self.explainer_lock:
+                if self.explainer is None:
+                    self.init_explainer()
+        return self.explainer
 
     def load_model(self):
         try:
-            with open(MODEL_PATH, 'rb') as f:
-                self.model = pickle.load(f)
-            print("✅ Model loaded successfully")
+            if self.backend == "booster":
+                import xgboost as xgb
+                self.model = xgb.Booster(model_file=self.model_path)
+                if XGB_NTHREAD:
+                    self.model.set_param({"nthread": XGB_NTHREAD})
+                # Sama seperti sklearn wrapper: pakai pohon sampai best_iteration
+                best_iteration = self.model.attr("best_iteration")
+                self.iteration_range = (0, int(best_iteration) + 1) if best_iteration is not None else (0, 0)
+            else:
+                with open(self.model_path, 'rb') as f:
+                    self.model = pickle.load(f)
+                if XGB_NTHREAD:
+                    self.model.get_booster().set_param({"nthread": XGB_NTHREAD})
+            print(f"✅ Model loaded successfully ({self.name}, {self.backend})")
         except Exception as e:
-            print(f"❌ Error loading model: {e}")
+            print(f"❌ Error loading model {self.name}: {e}")
+
+    def predict_scores(self, X: np.ndarray) -> np.ndarray:
+        """Probabilitas kelas positif untuk matriks fitur yang sudah di-encode"""
+        if self.backend == "booster":
+            return self.model.inplace_predict(X, iteration_range=self.iteration_range)
+        return self.model.predict_proba(X)[:, 1]
 
     def load_features(self):
         try:
-            with open(FEATURES_PATH, 'r') as f:
+            with open(self.features_path, 'r') as f:
                 self.EXPECTED_COLUMNS = json.load(f)
             print(f"✅ Features loaded successfully ({len(self.EXPECTED_COLUMNS)} features)")
         except Exception as e:
             print(f"❌ Error loading features json: {e}")
             self.EXPECTED_COLUMNS = []
+        self.encoder = FeatureEncoder(self.EXPECTED_COLUMNS)
+        # Rekomendasi per kolom dihitung sekali, dipakai ulang oleh explain_batch
+        self.recommendations = np.array(
+            [recommend_for_feature(col) for col in self.EXPECTED_COLUMNS] + [DEFAULT_RECOMMENDATION],
+            dtype=object
+        )
+
+    def compute_model_version(self):
+        """Hash isi file model & fitur: kalau salah satu artifact berubah, versinya ikut berubah"""
+        digest = hashlib.sha256()
+        for path in (self.model_path, self.features_path):
+            try:
+                with open(path, 'rb') as f:
+                    for block in iter(lambda: f.read(1024 * 1024), b""):
+                        digest.update(block)
+            except OSError:
+                digest.update(b"missing")
+        return digest.hexdigest()[:16]
 
     def init_explainer(self):
         """Inisialisasi SHAP TreeExplainer sekali saja biar cepat"""
-        if self.model:
+        if self.model is not None:
             try:
+                import shap # Pastikan library shap terinstall
                 self.explainer = shap.TreeExplainer(self.model)
-                print("✅ SHAP Explainer initialized")
+                print(f"✅ SHAP Explainer initialized ({self.name})")
             except Exception as e:
                 print(f"⚠️ Failed to init SHAP explainer: {e}")
 
-    def preprocess_input(self, data: dict) -> pd.DataFrame:
-        # 1. Buat DataFrame
-        df = pd.DataFrame([data])
-        
-        # 2. Feature Engineering
-        if 'pdays' in df.columns:
-            df['pdays'] = pd.to_numeric(df['pdays'], errors='coerce').fillna(999)
-            df['pernah_dihubungi'] = df['pdays'].apply(lambda x: 0 if x == 999 else 1)
-            df = df.drop(columns=['pdays'])
-        
-        # 3. Encoding & Alignment
-        df_encoded = pd.get_dummies(df, drop_first=True)
-        final_df = pd.DataFrame(0, index=df.index, columns=self.EXPECTED_COLUMNS)
-        
-        for col in df_encoded.columns:
-            # Normalisasi nama kolom (titik ke underscore) untuk matching
-            col_fixed = col.replace('.', '_')
-            # Cek kedua kemungkinan (nama asli atau nama fixed)
-            if col in final_df.columns:
-                final_df[col] = df_encoded[col]
-            elif col_fixed in final_df.columns:
-                final_df[col_fixed] = df_encoded[col]
-                
-        return final_df
+    def encode_frame(self, df: pd.DataFrame) -> np.ndarray:
+        """Encode banyak baris sekaligus ke layout manifest fitur model ini (matriks float32)"""
+        with ML_CALL_SECONDS.time(model=self.name, call="encode_frame"):
+            return self.encoder.encode_frame(df)
+
+    def preprocess_input(self, data: dict) -> np.ndarray:
+        with ML_CALL_SECONDS.time(model=self.name, call="preprocess_input"):
+            return self.encoder.encode_one(data)
 
     def predict(self, data: dict):
-        if not self.model: return {"error": "Model not loaded"}
+        if self.model is None: return {"error": "Model not loaded"}
         
         try:
             processed_data = self.preprocess_input(data)
-            probability = self.model.predict_proba(processed_data)[0][1]
-            label = "High Potential" if probability > 0.7 else "Medium Potential" if probability > 0.3 else "Low Potential"
-            
-            return {"score": float(probability), "label": label}
+            if MICROBATCH_ENABLED:
+                # Digabung dengan request lain yang datang bersamaan jadi satu predict
+                return self.score_batcher.submit(processed_data[0]).result()
+
+            return self.predict_encoded(processed_data)[0]
         except Exception as e:
             return {"error": str(e)}
 
+    def predict_encoded(self, X: np.ndarray):
+        """Skoring matriks yang sudah di-encode (dipakai ulang kalau SHAP juga dihitung)"""
+        if self.model is None: return [{"error": "Model not loaded"}] * len(X)
+        if len(X) == 0: return []
+
+        # Baris yang vektor fiturnya sudah pernah diskor model ini tidak masuk ke model lagi
+        with ML_CALL_SECONDS.time(model=self.name, call="predict_encoded"):
+            return prediction_cache.map(self.model_version, X, self.run_scores)
+
+    def run_scores(self, X: np.ndarray):
+        """compute_scores di proses CPU pool kalau CPU_POOL_WORKERS > 0, selain itu di thread ini"""
+        ML_ROWS.inc(len(X), model=self.name, call="run_scores")
+        with ML_CALL_SECONDS.time(model=self.name, call="run_scores"):
+            if cpu_pool.enabled:
+                return cpu_pool.compute_scores(self.spec, X)
+            return self.compute_scores(X)
+
+    def compute_scores(self, X: np.ndarray):
+        probabilities = self.predict_scores(X)
+        return [
+            {"score": float(p), "label": score_to_label(p), "model_version": self.model_version}
+            for p in probabilities.tolist()
+        ]
+
     def explain_prediction(self, data: dict):
         """
         Menghasilkan penjelasan SHAP values dan Rekomendasi Percakapan
         """
-        if not self.explainer:
+        if not self.has_explainer():
             return None
 
         try:
             processed_data = self.preprocess_input(data)
-            shap_values = self.explainer.shap_values(processed_data)
-            
-            # XGBoost binary classification return array of shape (1, n_features)
-            # Kita ambil index 0
-            values = shap_values[0]
-            
-            # Buat list fitur dan dampaknya
-            explanation = []
-            for i, col_name in enumerate(self.EXPECTED_COLUMNS):
-                impact = float(values[i])
-                if abs(impact) > 0.05: # Ambil hanya yang berdampak signifikan
-                    explanation.append({
-                        "feature": col_name,
-                        "impact": impact,
-                        "value": float(processed_data.iloc[0, i])
-                    })
-            
-            # Sort by absolute impact (terbesar ke terkecil)
-            explanation.sort(key=lambda x: abs(x['impact']), reverse=True)
-            
-            # Generate Simple Insight / Script (Next Best Conversation)
-            top_feature = explanation[0]['feature'] if explanation else ""
-            recommendation = "Gali kebutuhan nasabah secara umum."
-            
-            if "nr_employed" in top_feature or "euribor" in top_feature:
-                recommendation = "Buka percakapan dengan membahas kondisi ekonomi yang sedang stabil/bagus untuk investasi."
-            elif "pernah_dihubungi" in top_feature:
-                recommendation = "Sebutkan bahwa kita pernah menghubungi beliau sebelumnya dan ada penawaran baru."
-            elif "age" in top_feature:
-                recommendation = "Sesuaikan nada bicara dengan usia nasabah (pensiunan vs pekerja aktif)."
-            
-            return {
-                "shap_values": explanation[:5], 
-                "recommendation": recommendation
-            }
-            
+            if MICROBATCH_ENABLED:
+                return self.explain_batcher.submit(processed_data[0]).result()
+            return self.explain_batch(processed_data)[0]
         except Exception as e:
             print(f"Explain Error: {e}")
             return None
 
-ml_service = MLService()
\ No newline at end of file
+    def explain_batch(self, X: np.ndarray, top_k: int = 5):
+        """SHAP untuk satu matriks penuh, baris yang sudah ada di cache tidak dihitung ulang"""
+        if not self.has_explainer():
+            return [None] * len(X)
+        if len(X) == 0:
+            return []
+        with ML_CALL_SECONDS.time(model=self.name, call="explain_batch"):
+            return explanation_cache.map(f"{self.model_version}:{top_k}", X, lambda rows: self.run_explanations(rows, top_k))
+
+    def has_explainer(self) -> bool:
+        # Dengan CPU pool, explainer dibuat di proses worker (proses utama tidak perlu memuat shap)
+        if cpu_pool.enabled:
+            return self.model is not None
+        return self.get_explainer() is not None
+
+    def run_explanations(self, X: np.ndarray, top_k: int = 5):
+        ML_ROWS.inc(len(X), model=self.name, call="run_explanations")
+        with ML_CALL_SECONDS.time(model=self.name, call="run_explanations"):
+            if cpu_pool.enabled:
+                return cpu_pool.compute_explanations(self.spec, X, top_k)
+            return self.compute_explanations(X, top_k)
+
+    def compute_explanations(self, X: np.ndarray, top_k: int = 5):
+        """
+        SHAP untuk satu matriks penuh (satu panggilan TreeExplainer).
+        Top-k fitur per baris dipilih dengan argpartition + mask ambang impact,
+        rekomendasi diambil dari tabel per kolom, tanpa loop per fitur.
+        """
+        shap_values = np.asarray(self.explainer.shap_values(X))
+        n_rows, n_features = shap_values.shape
+        k = min(top_k, n_features)
+        rows = np.arange(n_rows)[:, None]
+
+        # 1. Ambil k fitur dengan |impact| terbesar, lalu urutkan (terbesar ke terkecil)
+        abs_values = np.abs(shap_values)
+        top = np.argpartition(-abs_values, k - 1, axis=1)[:, :k]
+        top = top[rows, np.argsort(-abs_values[rows, top], axis=1, kind='stable')]
+
+        # 2. Buang yang dampaknya tidak signifikan
+        impacts = shap_values[rows, top]
+        feature_values = X[rows, top]
+        significant = np.abs(impacts) > SHAP_IMPACT_THRESHOLD
+
+        # 3. Rekomendasi dari fitur teratas (index terakhir = default kalau tidak ada yang signifikan)
+        top_feature = np.where(significant[:, 0], top[:, 0], n_features)
+        recommendations = self.recommendations[top_feature]
+
+        columns = self.EXPECTED_COLUMNS
+        top, impacts, feature_values = top.tolist(), impacts.tolist(), feature_values.tolist()
+        return [
+            {
+                "shap_values": [
+                    {"feature": columns[top[i][j]], "impact": impacts[i][j], "value": feature_values[i][j]}
+                    for j in range(k) if significant[i, j]
+                ],
+                "recommendation": recommendations[i]
+            }
+            for i in range(n_rows)
+        ]
+
+    def info(self) -> dict:
+        return {
+            "name": self.name,
+            "model_version": self.model_version,
+            "backend": self.backend,
+            "model_path": self.model_path,
+            "features_path": self.features_path,
+            "n_features": len(self.EXPECTED_COLUMNS),
+            "loaded": self.model is not None,
+            "explainer_loaded": self.explainer is not None,
+            "load_seconds": round(self.load_seconds, 3) if self.load_seconds is not None else None
+        }
+
+class MLService:
+    """
+    Registry model di ml_assets/. Semua request memakai model aktif (self.active);
+    promote() / reload() mengganti referensinya tanpa restart server.
+    """
+    def __init__(self, load: bool = True):
+        self.registry_lock = threading.Lock() # Serialisasi reload/promote (bukan untuk request)
+        self.registry_mtime = None
+        entries, active_name, _ = self.read_registry()
+        self.models = {}
+        # Model aktif langsung dibuat (belum dimuat) supaya model_version sudah tersedia sebelum load
+        self.active = LoadedModel(active_name, entries[active_name])
+        self.shadow = None # Model kandidat untuk shadow scoring (lihat shadow.py)
+
+        self.ready = threading.Event() # Di-set setelah model & fitur selesai dimuat
+        self.load_seconds = None
+        
+        if load:
+            self.load()
+            if not cpu_pool.enabled:
+                self.init_explainer() # Inisialisasi explainer (dengan CPU pool: di proses worker)
+
+    # --- Registry ---
+    def read_registry(self):
+        """(entries, nama model aktif, nama model shadow) dari registry.json, path di dalamnya relatif ke folder registry"""
+        if not os.path.exists(REGISTRY_PATH):
+            entries = {DEFAULT_MODEL_NAME: {"model": MODEL_PATH, "booster": BOOSTER_PATH, "features": FEATURES_PATH}}
+            return entries, DEFAULT_MODEL_NAME, None
+
+        self.registry_mtime = os.path.getmtime(REGISTRY_PATH)
+        with open(REGISTRY_PATH, 'r') as f:
+            registry = json.load(f)
+        base = os.path.dirname(os.path.abspath(REGISTRY_PATH))
+        entries = {
+            name: {key: os.path.join(base, path) for key, path in entry.items()}
+            for name, entry in registry["models"].items()
+        }
+        active_name = registry.get("active")
+        if active_name not in entries:
+            raise ValueError(f"Active model '{active_name}' is not in registry")
+        # Model kandidat (opsional) yang diskor di belakang layar untuk dibandingkan dengan model aktif
+        shadow_name = registry.get("shadow")
+        if shadow_name is not None and shadow_name not in entries:
+            raise ValueError(f"Shadow model '{shadow_name}' is not in registry")
+        return entries, active_name, shadow_name
+
+    def save_registry_field(self, key: str, value):
+        """Simpan active/shadow ke registry.json supaya tetap dipakai setelah restart (dan oleh worker lain)"""
+        if not os.path.exists(REGISTRY_PATH):
+            return
+        with open(REGISTRY_PATH, 'r') as f:
+            registry = json.load(f)
+        if value is None:
+            registry.pop(key, None)
+        else:
+            registry[key] = value
+        tmp_path = REGISTRY_PATH + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(registry, f, indent=2)
+        os.replace(tmp_path, REGISTRY_PATH)
+        self.registry_mtime = os.path.getmtime(REGISTRY_PATH)
+
+    def load(self):
+        start = time.perf_counter()
+        try:
+            self.reload()
+        except Exception as e:
+            print(f"❌ Error loading model registry: {e}")
+        finally:
+            self.load_seconds = time.perf_counter() - start
+            self.ready.set()
+
+    def start_watcher(self):
+        """
+        Thread pengecek registry.json (kalau ML_REGISTRY_POLL_SECONDS > 0). Dipanggil saat startup server
+        (lifespan), bukan saat load: di mode pre-fork model dimuat di proses master sebelum fork,
+        dan thread tidak ikut ter-copy ke proses worker.
+        """
+        if ML_REGISTRY_POLL_SECONDS > 0:
+            threading.Thread(target=self.watch_registry, name="ml-registry-watcher", daemon=True).start()
+
+    def load_in_background(self):
+        threading.Thread(target=self.load, name="ml-loader", daemon=True).start()
+
+    def reload(self):
+        """
+        Baca ulang registry.json dan muat model yang baru / berubah (hot reload).
+        Model yang file-nya tidak berubah dipakai ulang apa adanya (explainer tidak dibuat ulang).
+        """
+        with self.registry_lock:
+            entries, active_name, shadow_name = self.read_registry()
+            models = {}
+            for name, entry in entries.items():
+                candidate = LoadedModel(name, entry)
+                current = self.models.get(name)
+                if current is None and self.active.name == name:
+                    current = self.active # Model aktif awal (dibuat di __init__, belum dimuat)
+                if current is not None and current.model_path == candidate.model_path and current.model_version == candidate.model_version:
+                    models[name] = current if current.model is not None else current.load()
+                else:
+                    models[name] = candidate.load()
+
+            self.models = models
+            if models[active_name].model is not None:
+                self.active = models[active_name]
+            else:
+                print(f"⚠️ Model {active_name} failed to load, keeping {self.active.name} active")
+            self.shadow = models.get(shadow_name) if shadow_name and models[shadow_name].model is not None else None
+        return self.list_models()
+
+    def promote(self, name: str) -> LoadedModel:
+        """Jadikan model `name` aktif. Request baru langsung pakai model ini, yang sedang jalan tidak terganggu."""
+        with self.registry_lock:
+            model = self.models.get(name)
+            if model is None:
+                raise KeyError(name)
+            if model.model is None:
+                raise ValueError(f"Model {name} is not loaded")
+            self.active = model
+            if self.shadow is model:
+                # Kandidat yang di-promote tidak perlu dibandingkan dengan dirinya sendiri
+                self.shadow = None
+                self.save_registry_field("shadow", None)
+            self.save_registry_field("active", name)
+            print(f"✅ Model promoted: {name} ({model.model_version})")
+            return model
+
+    def set_shadow(self, name: str = None):
+        """Pasang model `name` sebagai shadow (None = matikan shadow scoring)"""
+        with self.registry_lock:
+            model = None
+            if name is not None:
+                model = self.models.get(name)
+                if model is None:
+                    raise KeyError(name)
+                if model.model is None:
+                    raise ValueError(f"Model {name} is not loaded")
+                if model is self.active:
+                    raise ValueError(f"Model {name} is already active")
+            self.shadow = model
+            self.save_registry_field("shadow", name)
+            print(f"✅ Shadow model: {name}")
+            return model
+
+    def watch_registry(self):
+        self.wait_until_ready(timeout=None) # Load pertama (background) yang membaca registry_mtime awal
+        while True:
+            time.sleep(ML_REGISTRY_POLL_SECONDS)
+            try:
+                if os.path.exists(REGISTRY_PATH) and os.path.getmtime(REGISTRY_PATH) != self.registry_mtime:
+                    print("🔄 registry.json changed, reloading models")
+                    self.reload()
+            except Exception as e:
+                print(f"❌ Error reloading model registry: {e}")
+
+    def list_models(self):
+        return [
+            {**model.info(), "active": model is self.active, "shadow": model is self.shadow}
+            for model in self.models.values()
+        ]
+
+    def current(self) -> LoadedModel:
+        """Model aktif saat ini. Pipeline multi-langkah (encode -> predict -> SHAP) sebaiknya
+        memegang satu referensi ini supaya semua langkah pakai model yang sama."""
+        self.wait_until_ready()
+        return self.active
+
+    def wait_until_ready(self, timeout: float = ML_READY_TIMEOUT) -> bool:
+        return self.ready.wait(timeout)
+
+    # --- Atribut model aktif (kompatibel dengan kode lama) ---
+    @property
+    def model(self):
+        return self.active.model
+
+    @property
+    def explainer(self):
+        return self.active.explainer
+
+    @property
+    def model_version(self):
+        return self.active.model_version
+
+    @property
+    def model_name(self):
+        return self.active.name
+
+    @property
+    def EXPECTED_COLUMNS(self):
+        return self.active.EXPECTED_COLUMNS
+
+    @property
+    def encoder(self):
+        return self.active.encoder
+
+    @property
+    def score_batcher(self):
+        return self.active.score_batcher
+
+    def get_explainer(self):
+        return self.current().get_explainer()
+
+    def init_explainer(self):
+        self.active.init_explainer()
+
+    # --- Inference dengan model aktif ---
+    def encode_frame(self, df: pd.DataFrame) -> np.ndarray:
+        """Encode banyak baris sekaligus ke layout model_features.json (matriks float32)"""
+        return self.current().encode_frame(df)
+
+    def preprocess_input(self, data: dict) -> np.ndarray:
+        return self.current().preprocess_input(data)
+
+    def predict(self, data: dict):
+        return self.current().predict(data)
+
+    def predict_async(self, data: dict):
+        """Future berisi hasil predict (lewat micro-batcher)"""
+        model = self.current()
+        return model.score_batcher.submit(model.preprocess_input(data)[0])
+
+    def predict_batch(self, df: pd.DataFrame):
+        """
+        Skoring satu DataFrame penuh: encode sekali, predict_proba sekali.
+        Hasilnya list dict dengan format yang sama seperti predict().
+        """
+        model = self.current()
+        return model.predict_encoded(model.encode_frame(df))
+
+    def predict_encoded(self, X: np.ndarray):
+        return self.current().predict_encoded(X)
+
+    def explain_prediction(self, data: dict):
+        return self.current().explain_prediction(data)
+
+    def explain_async(self, data: dict):
+        """Future berisi hasil explain_prediction (lewat micro-batcher)"""
+        model = self.current()
+        return model.explain_batcher.submit(model.preprocess_input(data)[0])
+
+    def explain_batch(self, X: np.ndarray, top_k: int = 5):
+        return self.current().explain_batch(X, top_k)
+
+ml_service = MLService(load=ML_LOAD_MODE == "eager")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, func
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, JSON, Index, func
 from sqlalchemy.orm import relationship
 from .database import Base
 
@@ -69,7 +69,128 @@ class Lead(Base):
     # Prediction Results
     prediction_score = Column(Float, nullable=True)
     prediction_label = Column(String, nullable=True)
+    model_version = Column(String, nullable=True) # Versi model (registry) yang menghasilkan skor di atas
+
+    # Hash isi data nasabah (ingest.content_hashes), untuk dedup upload CSV
+    content_hash = Column(String, nullable=True, index=True)
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now())
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now())
+
+    __table_args__ = (
+        # Untuk sort score_high/score_low + keyset pagination (score, id)
+        Index("ix_leads_score_id", "prediction_score", "id"),
+        Index("ix_leads_created_at", "created_at"),
+        # Filter label + sort score_high/score_low: tanpa index ini, label "Low Potential" harus melewati
+        # semua lead skor tinggi dulu. Kolom filter lain sengaja tanpa index (lihat crud.LEAD_CATEGORY_FILTERS)
+        Index("ix_leads_label_score_id", "prediction_label", "prediction_score", "id"),
+    )
+class IngestJob(Base):
+    __tablename__ = "ingest_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    filename = Column(String)
+    file_path = Column(String)  # Salinan file upload di disk (dibaca oleh worker)
+
+    # queued -> running -> done / failed
+    status = Column(String, default="queued", index=True)
+    explain = Column(Boolean, default=False)  # Hitung SHAP sekalian saat ingest
+    dedup = Column(String, default="none")    # Mode dedup (ingest.DEDUP_MODES)
+    rows_total = Column(Integer, nullable=True)
+    rows_done = Column(Integer, default=0)    # Baris CSV yang sudah diproses
+    rows_inserted = Column(Integer, default=0)
+    rows_updated = Column(Integer, default=0)
+    rows_skipped = Column(Integer, default=0)
+    elapsed_seconds = Column(Float, default=0.0)
+    error = Column(String, nullable=True)
+    user_id = Column(Integer, nullable=True) # User yang meng-upload (activity log), None kalau tanpa login
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+class RescoreJob(Base):
+    __tablename__ = "rescore_jobs"
+
+    # Skoring ulang semua lead dengan model yang baru di-promote (background, per batch)
+    id = Column(Integer, primary_key=True, index=True)
+    model_name = Column(String)
+    model_version = Column(String)
+
+    # queued -> running -> done / failed / cancelled (model aktif sudah diganti lagi)
+    status = Column(String, default="queued", index=True)
+    rows_total = Column(Integer, nullable=True)
+    rows_done = Column(Integer, default=0)
+    elapsed_seconds = Column(Float, default=0.0)
+    error = Column(String, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+class ShadowScore(Base):
+    __tablename__ = "shadow_scores"
+
+    # Skor model aktif vs model kandidat (shadow) untuk lead yang sama, dipakai laporan A/B
+    id = Column(Integer, primary_key=True, index=True)
+    lead_id = Column(Integer, ForeignKey("leads.id"), index=True)
+    active_version = Column(String)
+    active_score = Column(Float)
+    active_label = Column(String)
+    shadow_version = Column(String)
+    shadow_score = Column(Float)
+    shadow_label = Column(String)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # Laporan: N baris terakhir untuk pasangan (shadow, aktif) tertentu
+        Index("ix_shadow_scores_versions", "shadow_version", "active_version", "id"),
+    )
+
+class LeadExplanation(Base):
+    __tablename__ = "lead_explanations"
+
+    # Satu cache penjelasan per lead, ditimpa kalau model_version berubah
+    lead_id = Column(Integer, ForeignKey("leads.id"), primary_key=True)
+    model_version = Column(String, index=True)
+    shap_values = Column(JSON)
+    recommendation = Column(String)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class DashboardStatBucket(Base):
+    __tablename__ = "dashboard_stat_buckets"
+
+    # Ringkasan dashboard yang di-update setiap insert/rescoring lead
+    # contoh: ("age", "26-35") -> 120, ("label", "High Potential") -> 45, ("total", "all") -> 1000
+    dimension = Column(String, primary_key=True)
+    bucket = Column(String, primary_key=True)
+    count = Column(Integer, default=0)
+
+class ActivityEvent(Base):
+    __tablename__ = "activity_events"
+
+    # Log aktivitas append-only (tidak pernah di-update / dihapus), lihat activity.py
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=True) # None = tanpa login (AUTH_REQUIRED=false)
+    action = Column(String) # activity.ACTIONS
+    lead_id = Column(Integer, nullable=True) # Lead terkait (import: lead pertama di batch)
+    lead_count = Column(Integer, default=1)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # Feed "recent activity" per user: N event terakhir
+        Index("ix_activity_events_user_id", "user_id", "id"),
+    )
+
+class UserActivityCounter(Base):
+    __tablename__ = "user_activity_counters"
+
+    # Hitungan berjalan per user, di-update (UPSERT) dalam transaksi yang sama dengan event-nya.
+    # user_id 0 = aktivitas tanpa login (bukan foreign key ke users)
+    user_id = Column(Integer, primary_key=True)
+    leads_added = Column(Integer, default=0)
+    high_potential_added = Column(Integer, default=0) # Label saat lead masuk (rescoring tidak mengubah ini)
+    notes_updated = Column(Integer, default=0)
+    first_activity_at = Column(DateTime(timezone=True), nullable=True)
+    last_activity_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,108 @@
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+
+class PredictionCache:
+    """
+    Cache LRU + TTL untuk hasil model per baris fitur yang sudah di-encode.
+    Kunci = (model_version, isi vektor fitur), jadi lead dengan profil sama
+    (atau CSV yang di-upload ulang) tidak perlu diskor lagi, dan ganti model
+    otomatis memakai namespace baru (entry lama tersingkir lewat LRU/TTL).
+    """
+    def __init__(self, max_size: int, ttl_seconds: float = 0, name: str = "cache"):
+        self.max_size = max_size   # 0 = cache mati
+        self.ttl = ttl_seconds     # 0 = tanpa kadaluarsa
+        self.name = name
+        self.entries = OrderedDict() # key -> (expires_at, value), urutan = LRU (paling lama di depan)
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    @staticmethod
+    def row_keys(namespace: str, X: np.ndarray) -> list:
+        # Normalisasi: float32 contiguous, -0.0 jadi 0.0, supaya vektor yang sama selalu key yang sama.
+        # Key = bytes vektor itu sendiri (di-hash oleh dict, tanpa risiko tabrakan); lewat view np.void
+        # semua baris jadi bytes dalam satu panggilan, jauh lebih murah dari hashlib per baris.
+        X = np.ascontiguousarray(X, dtype=np.float32) + np.float32(0)
+        rows = X.view(np.dtype((np.void, X.shape[1] * X.itemsize))).ravel().tolist()
+        return [(namespace, row) for row in rows]
+
+    def get_many(self, keys: list) -> list:
+        """Hasil per key (None kalau miss / kadaluarsa)"""
+        now = time.monotonic()
+        results = []
+        with self.lock:
+            for key in keys:
+                entry = self.entries.get(key)
+                if entry is not None and self.ttl and entry[0] < now:
+                    del self.entries[key]
+                    self.expirations += 1
+                    entry = None
+                if entry is None:
+                    self.misses += 1
+                    results.append(None)
+                else:
+                    self.hits += 1
+                    self.entries.move_to_end(key)
+                    results.append(entry[1])
+        return results
+
+    def put_many(self, items):
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self.lock:
+            for key, value in items:
+                self.entries[key] = (expires_at, value)
+                self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def map(self, namespace: str, X: np.ndarray, fn) -> list:
+        """
+        Sama seperti fn(X) (list hasil per baris), tapi hanya baris yang belum ada di cache
+        yang dikirim ke fn, dan baris duplikat dalam X cukup dihitung sekali.
+        """
+        if not self.enabled or len(X) == 0:
+            return fn(X)
+
+        keys = self.row_keys(namespace, X)
+        results = self.get_many(keys)
+
+        # Baris unik yang miss -> index baris pertama di X
+        missing = {}
+        for i, (key, result) in enumerate(zip(keys, results)):
+            if result is None and key not in missing:
+                missing[key] = i
+        if not missing:
+            return results
+
+        computed = fn(X[list(missing.values())])
+        by_key = dict(zip(missing.keys(), computed))
+        # None (mis. explainer belum siap) / error tidak disimpan di cache
+        self.put_many((key, value) for key, value in by_key.items() if value is not None and "error" not in value)
+        return [result if result is not None else by_key[key] for key, result in zip(keys, results)]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
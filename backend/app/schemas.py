@@ -38,6 +38,7 @@ class LeadResponse(LeadBase):
     id: int
     prediction_score: Optional[float] = None
     prediction_label: Optional[str] = None
+    model_version: Optional[str] = None
     created_at: datetime
     
     explanation: Optional[Dict[str, Any]] = None 
@@ -57,4 +58,41 @@ class DashboardStats(BaseModel):
     marital_dist: List[Dict[str, Any]]
     edu_dist: List[Dict[str, Any]]
     job_dist: List[Dict[str, Any]]
-    econ_dist: List[Dict[str, Any]]
\ No newline at end of file
+    econ_dist: List[Dict[str, Any]]
+# Schema untuk status Background Ingestion Job
+class IngestJobResponse(BaseModel):
+    id: int
+    filename: Optional[str] = None
+    status: str
+    rows_total: Optional[int] = None
+    rows_done: int
+    rows_inserted: Optional[int] = None
+    rows_updated: Optional[int] = None
+    rows_skipped: Optional[int] = None
+    rows_per_sec: Optional[float] = None
+    eta_seconds: Optional[float] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+# Schema untuk status Rescoring Job (setelah model baru di-promote)
+class RescoreJobResponse(BaseModel):
+    id: int
+    model_name: Optional[str] = None
+    model_version: str
+    status: str
+    rows_total: Optional[int] = None
+    rows_done: int
+    rows_per_sec: Optional[float] = None
+    eta_seconds: Optional[float] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+# User yang sedang login (hasil verifikasi token, disimpan di cache token)
+class CurrentUser(BaseModel):
+    id: int
+    username: str
+    is_active: bool = True
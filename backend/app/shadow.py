@@ -0,0 +1,162 @@
+import os
+import queue
+import threading
+import time
+import traceback
+from collections import Counter, deque
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+
+from . import crud
+from .database import SessionLocal
+from .ml_service import ml_service
+
+# Maks batch yang antri ke worker shadow. Kalau penuh, batch dibuang (request tidak pernah menunggu)
+SHADOW_QUEUE_SIZE = int(os.getenv("SHADOW_QUEUE_SIZE", 100))
+# Jumlah panggilan scoring terakhir yang dipakai untuk statistik latency per model
+SHADOW_LATENCY_WINDOW = int(os.getenv("SHADOW_LATENCY_WINDOW", 1000))
+
+def latency_summary(seconds: list, rows: int) -> dict:
+    ms = np.array(seconds) * 1000
+    return {
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "per_row_us": round(float(ms.sum()) * 1000 / rows, 2) if rows else None
+    }
+
+class ShadowScorer:
+    """
+    Shadow scoring: lead yang baru diskor model aktif juga diskor model kandidat
+    (ml_service.shadow) di thread worker, lalu kedua skornya disimpan di shadow_scores.
+    Di jalur request hanya ada put_nowait ke antrian, jadi latency request tidak berubah.
+    """
+    def __init__(self):
+        self.queue = queue.Queue(maxsize=SHADOW_QUEUE_SIZE)
+        self.thread = None
+        self.lock = threading.Lock()
+        # (shadow_version, active_version) -> deque (jumlah baris, detik model aktif, detik model shadow)
+        self.latencies = {}
+        self.dropped = 0
+        self.errors = 0
+
+    def submit(self, lead_ids: list, data, predictions: list, active_seconds: float) -> bool:
+        """
+        Dipanggil setelah lead disimpan. data: DataFrame (chunk CSV) atau list dict lead,
+        predictions: hasil model aktif, active_seconds: waktu encode + predict model aktif.
+        """
+        shadow = ml_service.shadow
+        if shadow is None or not lead_ids:
+            return False
+        try:
+            self.queue.put_nowait((shadow, lead_ids, data, predictions, active_seconds))
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name="shadow-scorer", daemon=True)
+                self.thread.start()
+        return True
+
+    def run(self):
+        while True:
+            item = self.queue.get()
+            try:
+                self.score(*item)
+            except Exception:
+                self.errors += 1
+                traceback.print_exc()
+
+    def score(self, shadow, lead_ids, data, predictions, active_seconds):
+        # Encode ulang dengan manifest fitur model shadow (bisa beda dengan model aktif)
+        start = time.perf_counter()
+        if isinstance(data, pd.DataFrame):
+            X = shadow.encode_frame(data)
+        else:
+            X = shadow.encoder.encode_records(data)
+        shadow_predictions = shadow.predict_encoded(X)
+        shadow_seconds = time.perf_counter() - start
+
+        active_version = predictions[0].get("model_version")
+        key = (shadow.model_version, active_version)
+        self.latencies.setdefault(key, deque(maxlen=SHADOW_LATENCY_WINDOW)).append(
+            (len(lead_ids), active_seconds, shadow_seconds)
+        )
+
+        rows = [
+            {
+                "lead_id": lead_id,
+                "active_version": prediction.get("model_version"),
+                "active_score": prediction.get("score"),
+                "active_label": prediction.get("label"),
+                "shadow_version": shadow.model_version,
+                "shadow_score": shadow_prediction.get("score"),
+                "shadow_label": shadow_prediction.get("label"),
+            }
+            for lead_id, prediction, shadow_prediction in zip(lead_ids, predictions, shadow_predictions)
+            if "error" not in prediction and "error" not in shadow_prediction
+        ]
+        if not rows:
+            return
+        db = SessionLocal()
+        try:
+            crud.create_shadow_scores_bulk(db, rows)
+        finally:
+            db.close()
+
+    def report(self, db: Session, window: int = 1000):
+        """Perbandingan model aktif vs shadow untuk `window` lead terakhir"""
+        shadow, active = ml_service.shadow, ml_service.active
+        if shadow is None:
+            return None
+
+        rows = crud.get_shadow_scores(db, shadow.model_version, active.model_version, limit=window)
+        result = {
+            "active": {"name": active.name, "model_version": active.model_version},
+            "shadow": {"name": shadow.name, "model_version": shadow.model_version},
+            "window": window,
+            "leads": len(rows),
+            "pending_batches": self.queue.qsize(),
+            "dropped_batches": self.dropped,
+            "errors": self.errors,
+            "drift": None,
+            "label_flip_rate": None,
+            "label_flips": [],
+            "latency": None,
+        }
+
+        if rows:
+            active_scores = np.array([row.active_score for row in rows])
+            shadow_scores = np.array([row.shadow_score for row in rows])
+            diff = shadow_scores - active_scores
+            result["drift"] = {
+                "mean_active_score": round(float(active_scores.mean()), 4),
+                "mean_shadow_score": round(float(shadow_scores.mean()), 4),
+                "mean_diff": round(float(diff.mean()), 4),
+                "mean_abs_diff": round(float(np.abs(diff).mean()), 4),
+                "p95_abs_diff": round(float(np.percentile(np.abs(diff), 95)), 4),
+            }
+
+            # Perpindahan label (mis. Medium -> High) antara model aktif dan shadow
+            flips = Counter((row.active_label, row.shadow_label) for row in rows if row.active_label != row.shadow_label)
+            result["label_flip_rate"] = round(sum(flips.values()) / len(rows), 4)
+            result["label_flips"] = [
+                {"from": old, "to": new, "count": count}
+                for (old, new), count in flips.most_common()
+            ]
+
+        calls = list(self.latencies.get((shadow.model_version, active.model_version), []))
+        if calls:
+            n_rows = sum(call[0] for call in calls)
+            result["latency"] = {
+                "calls": len(calls),
+                "rows": n_rows,
+                "active": latency_summary([call[1] for call in calls], n_rows),
+                "shadow": latency_summary([call[2] for call in calls], n_rows),
+            }
+        return result
+
+shadow_scorer = ShadowScorer()
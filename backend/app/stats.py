@@ -0,0 +1,222 @@
+import os
+from collections import Counter, defaultdict
+from sqlalchemy import and_, case, func, or_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from . import models
+
+# Batas bucket sama persis dengan CASE di query dashboard (nilai <= batas atas)
+AGE_BUCKETS = [(25, '18-25'), (35, '26-35'), (45, '36-45'), (55, '46-55'), (65, '56-65')]
+AGE_ELSE = '65+'
+SCORE_BUCKETS = [(0.2, '0-20'), (0.4, '21-40'), (0.6, '41-60'), (0.8, '61-80')]
+SCORE_ELSE = '81-100'
+ECON_BUCKETS = [(1.5, 'Low Interest'), (4.0, 'Medium Interest')]  # Berdasarkan euribor3m
+ECON_ELSE = 'High Interest'
+
+# Bucket NULL (mis. marital kosong di CSV) tidak bisa jadi primary key, jadi disimpan pakai penanda ini
+NULL_BUCKET = "__null__"
+
+# Sumber data /api/v1/dashboard/stats:
+# "materialized" (ringkasan incremental), "single_pass" (1 SELECT), "multi_query" (query lama)
+DASHBOARD_STATS_ENGINE = os.getenv("DASHBOARD_STATS_ENGINE", "materialized")
+
+def bucket_case(column, buckets, else_):
+    return case(*[(column <= upper, name) for upper, name in buckets], else_=else_)
+
+def bucket_of(value, buckets, else_):
+    # Versi Python dari bucket_case: NULL / NaN / bukan angka jatuh ke else_ (sama seperti SQL)
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return else_
+    if value == value:
+        for upper, name in buckets:
+            if value <= upper:
+                return name
+    return else_
+
+def category_of(value):
+    if value is None or value != value:
+        return NULL_BUCKET
+    return str(value)
+
+def lead_buckets(lead: dict):
+    """Semua (dimension, bucket) yang disumbang satu lead ke dashboard"""
+    return [
+        ("total", "all"),
+        ("label", category_of(lead.get("prediction_label"))),
+        ("age", bucket_of(lead.get("age"), AGE_BUCKETS, AGE_ELSE)),
+        ("score", bucket_of(lead.get("prediction_score"), SCORE_BUCKETS, SCORE_ELSE)),
+        ("marital", category_of(lead.get("marital"))),
+        ("education", category_of(lead.get("education"))),
+        ("economy", bucket_of(lead.get("euribor3m"), ECON_BUCKETS, ECON_ELSE)),
+        ("job", category_of(lead.get("job"))),
+        ("month", category_of(lead.get("month"))),
+    ]
+
+def apply_deltas(db: Session, deltas: Counter):
+    """UPSERT count = count + delta (tidak commit, ikut transaksi pemanggil)"""
+    rows = [
+        {"dimension": dimension, "bucket": bucket, "count": delta}
+        for (dimension, bucket), delta in deltas.items() if delta
+    ]
+    if not rows:
+        return
+    # INSERT ... ON CONFLICT DO UPDATE (sintaks sama di SQLite & PostgreSQL)
+    dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    stmt = dialect_insert(models.DashboardStatBucket)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["dimension", "bucket"],
+        set_={"count": models.DashboardStatBucket.count + stmt.excluded.count}
+    )
+    db.execute(stmt, rows)
+
+def apply_leads(db: Session, leads: list, sign: int = 1):
+    """Dipanggil saat insert (sign=+1) atau hapus (sign=-1) lead, sebelum commit"""
+    deltas = Counter()
+    for lead in leads:
+        for key in lead_buckets(lead):
+            deltas[key] += sign
+    apply_deltas(db, deltas)
+
+def apply_score_change(db: Session, old_score, old_label, new_score, new_label):
+    """Skor lead berubah (rescoring): pindahkan hitungan bucket label & score"""
+    apply_score_changes(db, [(old_score, old_label, new_score, new_label)])
+
+def apply_score_changes(db: Session, changes: list):
+    """Versi batch apply_score_change: list (old_score, old_label, new_score, new_label), 1 UPSERT"""
+    deltas = Counter()
+    for old_score, old_label, new_score, new_label in changes:
+        deltas[("label", category_of(old_label))] -= 1
+        deltas[("label", category_of(new_label))] += 1
+        deltas[("score", bucket_of(old_score, SCORE_BUCKETS, SCORE_ELSE))] -= 1
+        deltas[("score", bucket_of(new_score, SCORE_BUCKETS, SCORE_ELSE))] += 1
+    apply_deltas(db, deltas)
+
+def rebuild(db: Session):
+    """Hitung ulang seluruh ringkasan dari tabel leads (full scan, hanya untuk perbaikan/bootstrapping)"""
+    Lead = models.Lead
+    dimensions = {
+        "label": Lead.prediction_label,
+        "age": bucket_case(Lead.age, AGE_BUCKETS, AGE_ELSE),
+        "score": bucket_case(Lead.prediction_score, SCORE_BUCKETS, SCORE_ELSE),
+        "marital": Lead.marital,
+        "education": Lead.education,
+        "economy": bucket_case(Lead.euribor3m, ECON_BUCKETS, ECON_ELSE),
+        "job": Lead.job,
+        "month": Lead.month,
+    }
+
+    db.query(models.DashboardStatBucket).delete()
+    deltas = Counter()
+    deltas[("total", "all")] = db.query(func.count(Lead.id)).scalar()
+    for dimension, expr in dimensions.items():
+        for bucket, count in db.query(expr.label("bucket"), func.count(Lead.id)).group_by("bucket").all():
+            deltas[(dimension, category_of(bucket))] += count
+    apply_deltas(db, deltas)
+    db.commit()
+
+def ensure_built(db: Session):
+    """Startup: kalau ringkasan belum pernah dibuat / belum punya semua dimensi (DB lama), bangun dari data yang ada"""
+    if db.query(models.Lead.id).first() is None:
+        return
+    built = {dimension for (dimension,) in db.query(models.DashboardStatBucket.dimension).distinct()}
+    if not {"total", *COUNT_DIMENSIONS} <= built:
+        rebuild(db)
+
+def distribution(buckets: dict):
+    # Urutan sama seperti GROUP BY di SQLite (NULL duluan, lalu urut nama)
+    items = [(None if name == NULL_BUCKET else name, value) for name, value in buckets.items()]
+    items.sort(key=lambda item: (item[0] is not None, item[0] or ""))
+    return [{"name": name, "value": value} for name, value in items]
+
+def build_payload(dims: dict):
+    total = dims["total"].get("all", 0)
+    if total == 0: return {} # Handle empty DB
+
+    # Bucket dengan hitungan 0 tidak ikut (sama seperti hasil GROUP BY)
+    dims = {dimension: {k: v for k, v in buckets.items() if v > 0} for dimension, buckets in dims.items()}
+    high = dims["label"].get("High Potential", 0)
+    return {
+        "total_leads": total,
+        "high_potential": high,
+        "medium_potential": dims["label"].get("Medium Potential", 0),
+        "low_potential": dims["label"].get("Low Potential", 0),
+        "conversion_rate_estimate": round((high / total * 100), 2),
+
+        # Data untuk Grafik
+        "age_dist": distribution(dims["age"]),
+        "score_dist": distribution(dims["score"]),
+        "marital_dist": distribution(dims["marital"]),
+        "edu_dist": distribution(dims["education"]),
+        "job_dist": distribution(dims["job"]),
+        "econ_dist": distribution(dims["economy"])
+    }
+
+# Filter leads (crud.LEAD_CATEGORY_FILTERS) yang jumlahnya ada langsung di ringkasan
+COUNT_DIMENSIONS = ("label", "job", "education", "month")
+
+def bucket_count(db: Session, dimension: str, bucket: str) -> int:
+    """Jumlah lead di satu bucket ringkasan, dipakai crud.count_leads (0 kalau bucket belum ada)"""
+    row = db.get(models.DashboardStatBucket, (dimension, bucket))
+    return row.count if row is not None else 0
+
+def get_dashboard_stats(db: Session):
+    """Payload DashboardStats dari ringkasan (baca puluhan baris, tidak tergantung jumlah leads)"""
+    dims = defaultdict(dict)
+    rows = db.query(models.DashboardStatBucket).filter(models.DashboardStatBucket.count > 0).all()
+    for row in rows:
+        dims[row.dimension][row.bucket] = row.count
+    return build_payload(dims)
+
+def compute_single_pass(db: Session):
+    """
+    Fallback tanpa ringkasan: semua bucket dihitung dalam 1 SELECT (1x scan tabel leads).
+    Bucket numerik & label pakai SUM(CASE ...), distribusi kategorikal pakai
+    GROUP BY gabungan (marital, education, job) lalu dijumlahkan per dimensi di Python.
+    """
+    Lead = models.Lead
+
+    def count_if(condition):
+        return func.sum(case((condition, 1), else_=0))
+
+    def bucket_counts(column, buckets, else_):
+        # Kondisi range langsung (lower < x <= upper), lebih murah dari membandingkan hasil CASE
+        conditions, lower = [], None
+        for upper, _ in buckets:
+            conditions.append(column <= upper if lower is None else and_(column > lower, column <= upper))
+            lower = upper
+        conditions.append(or_(column > lower, column.is_(None)))
+        names = [name for _, name in buckets] + [else_]
+        return [count_if(condition) for condition in conditions], names
+
+    labels = ["High Potential", "Medium Potential", "Low Potential"]
+    numeric = {
+        "age": bucket_counts(Lead.age, AGE_BUCKETS, AGE_ELSE),
+        "score": bucket_counts(Lead.prediction_score, SCORE_BUCKETS, SCORE_ELSE),
+        "economy": bucket_counts(Lead.euribor3m, ECON_BUCKETS, ECON_ELSE),
+    }
+    columns = [Lead.marital, Lead.education, Lead.job, func.count(Lead.id)]
+    columns += [count_if(Lead.prediction_label == label) for label in labels]
+    for exprs, _ in numeric.values():
+        columns += exprs
+
+    dims = defaultdict(Counter)
+    for row in db.query(*columns).group_by(Lead.marital, Lead.education, Lead.job).all():
+        marital, education, job, count = row[:4]
+        dims["total"]["all"] += count
+        dims["marital"][category_of(marital)] += count
+        dims["education"][category_of(education)] += count
+        dims["job"][category_of(job)] += count
+
+        offset = 4
+        for label in labels:
+            dims["label"][label] += row[offset] or 0
+            offset += 1
+        for dimension, (_, names) in numeric.items():
+            for name in names:
+                dims[dimension][name] += row[offset] or 0
+                offset += 1
+
+    return build_payload(dims)
@@ -25,4 +25,10 @@ dummy_data = {
 
 print("--- Testing Prediction ---")
 result = ml_service.predict(dummy_data)
-print("Result:", result)
\ No newline at end of file
+print("Result:", result)
+print("--- Testing Batch Prediction ---")
+import pandas as pd
+batch_df = pd.DataFrame([dummy_data, {**dummy_data, "job": "blue-collar", "pdays": 3}])
+batch_result = ml_service.predict_batch(batch_df)
+print("Result:", batch_result)
+print("Same as predict():", batch_result[0] == result)
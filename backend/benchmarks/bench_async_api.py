@@ -0,0 +1,168 @@
+"""
+Load test: latency GET /api/v1/leads (p50/p99) saat server idle dan selama upload CSV besar
+berjalan, untuk beberapa konfigurasi server (uvicorn dijalankan sebagai proses terpisah):
+  threadpool        route async + Session sync di threadpool, predict/SHAP di thread (default)
+  async-db          ASYNC_DB_ENABLED=true (AsyncSession: aiosqlite / asyncpg)
+  async-db+cpu-pool ASYNC_DB_ENABLED=true + CPU_POOL_WORKERS=--cpu-workers
+
+--backend-dir bisa diarahkan ke checkout lain (mis. git worktree commit lama) untuk pembanding.
+
+Jalankan dari folder backend/:
+    python -m benchmarks.bench_async_api --rows 100000
+    python -m benchmarks.bench_async_api --configs threadpool async-db+cpu-pool --cpu-workers 2
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import httpx
+import numpy as np
+
+from benchmarks.synthetic import synthetic_csv
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def config_env(name: str, cpu_workers: int) -> dict:
+    return {
+        "threadpool": {"ASYNC_DB_ENABLED": "false", "CPU_POOL_WORKERS": "0"},
+        "async-db": {"ASYNC_DB_ENABLED": "true", "CPU_POOL_WORKERS": "0"},
+        "async-db+cpu-pool": {"ASYNC_DB_ENABLED": "true", "CPU_POOL_WORKERS": str(cpu_workers)},
+    }[name]
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def wait_ready(base_url: str, timeout: float = 180):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/api/v1/ready", timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise TimeoutError("Server not ready")
+
+def upload(base_url: str, csv_bytes: bytes) -> dict:
+    response = httpx.post(f"{base_url}/api/v1/upload-csv", files={"file": ("bench.csv", csv_bytes)}, timeout=None)
+    response.raise_for_status()
+    return response.json()
+
+def measure_reads(base_url: str, readers: int, until) -> dict:
+    stop = threading.Event()
+    latencies = []
+    errors = []
+
+    def read_loop():
+        with httpx.Client(base_url=base_url, timeout=60) as client:
+            while not stop.is_set():
+                start = time.perf_counter()
+                try:
+                    client.get("/api/v1/leads", params={"limit": 100, "sort_by": "newest"}).raise_for_status()
+                except httpx.HTTPError as e:
+                    errors.append(str(e))
+                latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=read_loop) for _ in range(readers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    until()
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    ms = np.array(latencies) * 1000
+    return {
+        "requests": len(latencies),
+        "req_per_sec": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(float(np.percentile(ms, 50)), 2),
+        "p99_ms": round(float(np.percentile(ms, 99)), 2),
+        "max_ms": round(float(ms.max()), 2),
+        "errors": len(errors),
+    }
+
+def run_config(name: str, args, base_csv: bytes, big_csv: bytes) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        env = {
+            **os.environ, **config_env(name, args.cpu_workers),
+            "ML_LOAD_MODE": "eager",
+            "UPLOAD_DIR": tmp,
+            "DATABASE_URL": args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+        }
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)],
+            cwd=args.backend_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            wait_ready(base_url)
+            upload(base_url, base_csv)
+            time.sleep(args.warmup_seconds) # Worker CPU pool & backfill selesai dulu
+
+            idle = measure_reads(base_url, args.readers, lambda: time.sleep(args.idle_seconds))
+
+            result = {}
+            def big_upload():
+                start = time.perf_counter()
+                result["response"] = upload(base_url, big_csv)
+                result["seconds"] = time.perf_counter() - start
+            uploader = threading.Thread(target=big_upload)
+            uploader.start()
+            during = measure_reads(base_url, args.readers, uploader.join)
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+    return {
+        "config": name,
+        "rows": args.rows,
+        "upload_seconds": round(result["seconds"], 2),
+        "upload_rows_per_sec": round(args.rows / result["seconds"], 1),
+        "idle": idle,
+        "during_upload": during,
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--configs", nargs="+", default=["threadpool", "async-db", "async-db+cpu-pool"],
+                        choices=["threadpool", "async-db", "async-db+cpu-pool"])
+    parser.add_argument("--cpu-workers", type=int, default=2)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--base-rows", type=int, default=20000)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--idle-seconds", type=float, default=5.0)
+    parser.add_argument("--warmup-seconds", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", default=None, help="Default: SQLite sementara per konfigurasi")
+    parser.add_argument("--backend-dir", default=BACKEND_DIR)
+    parser.add_argument("--output", default=None, help="Simpan hasil (JSON) ke file ini")
+    args = parser.parse_args()
+
+    base_csv = synthetic_csv(args.base_rows, args.seed)
+    big_csv = synthetic_csv(args.rows, args.seed + 1)
+
+    results = [run_config(name, args, base_csv, big_csv) for name in args.configs]
+
+    print(f"{'config':>18} {'phase':>14} {'req/s':>8} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9} {'errors':>7}")
+    for result in results:
+        for phase in ("idle", "during_upload"):
+            row = result[phase]
+            print(f"{result['config']:>18} {phase:>14} {row['req_per_sec']:>8} {row['p50_ms']:>9} {row['p99_ms']:>9} {row['max_ms']:>9} {row['errors']:>7}")
+        print(f"{result['config']:>18} upload {result['rows']} rows: {result['upload_seconds']}s ({result['upload_rows_per_sec']} rows/s)")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark overhead auth di route baca yang sering dipanggil (detail lead yang SHAP-nya sudah tersimpan,
+dashboard stats), plus latency baca selama banyak login (bcrypt) berjalan bersamaan:
+  off        AUTH_REQUIRED=false (dependency tidak dipasang)
+  cached     AUTH_REQUIRED=true, token cache aktif (default)
+  uncached   AUTH_REQUIRED=true, TOKEN_CACHE_SIZE=0 (decode JWT + query users tiap request)
+Setiap konfigurasi jalan di proses Python baru dengan DB kosong.
+
+Jalankan dari folder backend/:
+    python -m benchmarks.bench_auth --requests 2000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CONFIG_ENV = {
+    "off": {"AUTH_REQUIRED": "false"},
+    "cached": {"AUTH_REQUIRED": "true"},
+    "uncached": {"AUTH_REQUIRED": "true", "TOKEN_CACHE_SIZE": "0"},
+}
+
+CHILD = r"""
+import json, sys, threading, time
+import numpy as np
+import app.main
+from fastapi.testclient import TestClient
+from benchmarks.synthetic import synthetic_csv
+
+n_requests, login_clients, login_seconds = int(sys.argv[1]), int(sys.argv[2]), float(sys.argv[3])
+
+def summary(seconds):
+    ms = np.array(seconds) * 1000
+    return {"p50_ms": round(float(np.percentile(ms, 50)), 3), "p99_ms": round(float(np.percentile(ms, 99)), 3)}
+
+with TestClient(app.main.app) as client:
+    client.post("/api/v1/register", json={"username": "bench", "password": "bench-password"})
+    token = client.post("/api/v1/login", data={"username": "bench", "password": "bench-password"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    lead_id = client.post("/api/v1/upload-csv", files={"file": ("bench.csv", synthetic_csv(2000, 42))}, headers=headers).json()["sample_data"][0]["id"]
+
+    result = {}
+    for name, url in (("lead_detail", f"/api/v1/leads/{lead_id}"), ("dashboard_stats", "/api/v1/dashboard/stats")):
+        client.get(url, headers=headers).raise_for_status() # Warm-up (SHAP tersimpan, token masuk cache)
+        runs = []
+        for _ in range(n_requests):
+            start = time.perf_counter()
+            client.get(url, headers=headers)
+            runs.append(time.perf_counter() - start)
+        result[name] = summary(runs)
+
+    # Baca dashboard selama login_clients thread terus-menerus login
+    stop = threading.Event()
+    logins = []
+    def login_loop():
+        while not stop.is_set():
+            start = time.perf_counter()
+            client.post("/api/v1/login", data={"username": "bench", "password": "bench-password"}).raise_for_status()
+            logins.append(time.perf_counter() - start)
+    threads = [threading.Thread(target=login_loop) for _ in range(login_clients)]
+    for thread in threads:
+        thread.start()
+    reads = []
+    deadline = time.monotonic() + login_seconds
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        client.get("/api/v1/dashboard/stats", headers=headers)
+        reads.append(time.perf_counter() - start)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    result["logins_per_sec"] = round(len(logins) / login_seconds, 1)
+    result["login"] = summary(logins)
+    result["dashboard_during_logins"] = summary(reads)
+
+print("RESULT " + json.dumps(result))
+"""
+
+def measure(config: str, args) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, **CONFIG_ENV[config], "PYTHONPATH": BACKEND_DIR, "ML_LOAD_MODE": "eager", "UPLOAD_DIR": tmp,
+               "DATABASE_URL": f"sqlite:///{os.path.join(tmp, 'bench.db')}"}
+        command = [sys.executable, "-c", CHILD, str(args.requests), str(args.login_clients), str(args.login_seconds)]
+        out = subprocess.run(command, cwd=tmp, env=env, capture_output=True, text=True)
+    lines = [line for line in out.stdout.splitlines() if line.startswith("RESULT ")]
+    if out.returncode != 0 or not lines:
+        raise RuntimeError(f"{config} failed:\n{out.stderr[-2000:]}")
+    return json.loads(lines[-1][len("RESULT "):])
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--configs", nargs="+", default=list(CONFIG_ENV), choices=list(CONFIG_ENV))
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--login-clients", type=int, default=4)
+    parser.add_argument("--login-seconds", type=float, default=5.0)
+    parser.add_argument("--output", default=None, help="Simpan hasil (JSON) ke file ini")
+    args = parser.parse_args()
+
+    results = {config: measure(config, args) for config in args.configs}
+
+    print(f"{'config':>9} {'detail p50':>11} {'detail p99':>11} {'stats p50':>10} {'stats p99':>10} {'logins/s':>9} {'stats p99 (logins)':>19}")
+    for config, r in results.items():
+        print(f"{config:>9} {r['lead_detail']['p50_ms']:>11} {r['lead_detail']['p99_ms']:>11} {r['dashboard_stats']['p50_ms']:>10} "
+              f"{r['dashboard_stats']['p99_ms']:>10} {r['logins_per_sec']:>9} {r['dashboard_during_logins']['p99_ms']:>19}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
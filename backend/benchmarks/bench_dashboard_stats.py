@@ -0,0 +1,86 @@
+"""
+Benchmark get_dashboard_stats: query lama (multi_query) vs single_pass vs materialized.
+
+Jalankan dari folder backend/:
+    python -m benchmarks.bench_dashboard_stats --sizes 10000 100000 1000000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app import models, crud, stats
+
+JOBS = ["admin.", "blue-collar", "technician", "services", "management", "retired",
+        "entrepreneur", "self-employed", "housemaid", "unemployed", "student", "unknown"]
+MARITAL = ["married", "single", "divorced", "unknown"]
+EDUCATION = ["university.degree", "high.school", "basic.9y", "professional.course",
+             "basic.4y", "basic.6y", "unknown", "illiterate"]
+
+def fake_leads(n: int, rng: random.Random):
+    for _ in range(n):
+        score = rng.random()
+        yield {
+            "age": rng.randint(18, 90),
+            "job": rng.choice(JOBS),
+            "marital": rng.choice(MARITAL),
+            "education": rng.choice(EDUCATION),
+            "euribor3m": round(rng.uniform(0.6, 5.1), 3),
+            "prediction_score": score,
+            "prediction_label": "High Potential" if score > 0.7 else "Medium Potential" if score > 0.3 else "Low Potential",
+        }
+
+def populate(db, n: int, seed: int, chunk_size: int = 50000):
+    rng = random.Random(seed)
+    leads = fake_leads(n, rng)
+    while True:
+        chunk = [lead for _, lead in zip(range(chunk_size), leads)]
+        if not chunk:
+            break
+        db.execute(insert(models.Lead), chunk)
+    db.commit()
+    stats.rebuild(db)
+
+def timed(fn, db, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(db)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    engines = {
+        "multi_query": crud.get_dashboard_stats,
+        "single_pass": stats.compute_single_pass,
+        "materialized": stats.get_dashboard_stats,
+    }
+
+    print(f"{'leads':>10} " + " ".join(f"{name:>14}" for name in engines))
+    for n in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+            models.Base.metadata.create_all(bind=engine)
+            db = sessionmaker(bind=engine)()
+            populate(db, n, args.seed)
+
+            timings, results = {}, {}
+            for name, fn in engines.items():
+                timings[name], results[name] = timed(fn, db, args.repeat)
+            assert results["single_pass"] == results["multi_query"] == results["materialized"], "Payload berbeda antar engine"
+
+            print(f"{n:>10} " + " ".join(f"{timings[name] * 1000:>11.1f} ms" for name in engines))
+            db.close()
+            engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Benchmark filter server-side /api/v1/leads (crud.get_leads + crud.count_leads) dan biaya index-nya di ingest:
+  ingest   ingest_csv --ingest-rows baris ke DB kosong (rows/s, tahap insert & commit)
+  reads    DB diperbesar sampai --rows (INSERT ... SELECT dari baris hasil ingest), lalu per kombinasi
+           filter x sort: halaman pertama, halaman berikutnya (cursor), count, dan query plan SQLite
+Semua index dari models.Lead dipakai; --drop-indexes untuk membandingkan tanpa index tertentu.
+
+Jalankan dari folder backend/ (SQLite sementara, crm.db tidak disentuh):
+    python -m benchmarks.bench_lead_filters --rows 2000000
+    python -m benchmarks.bench_lead_filters --drop-indexes ix_leads_label_score_id --output /tmp/no_label.json
+
+Hasil (SQLite, 1 juta leads, ingest 100 ribu baris):
+  index leads                                     ingest rows/s   halaman (semua kasus)   count 2+ filter
+  8 index filter (label/job/education/month x
+    (kolom, id) & (kolom, skor, id))              6.942 - 7.747   2 - 58 ms               5 - 526 ms
+  hanya ix_leads_label_score_id (sekarang)        8.523 - 8.883   1,5 - 10 ms             15 - 433 ms
+  tanpa index filter                              9.137           label Low + score_high 1.119 ms
+"""
+import argparse
+import io
+import json
+import os
+import tempfile
+import time
+import numpy as np
+
+# (nama, filter, sort_by)
+CASES = [
+    ("none", {}, "newest"),
+    ("none", {}, "score_high"),
+    ("label", {"label": "High Potential"}, "newest"),
+    ("label", {"label": "High Potential"}, "score_high"),
+    ("label_low", {"label": "Low Potential"}, "score_high"),
+    ("job", {"job": "admin."}, "newest"),
+    ("job", {"job": "admin."}, "score_high"),
+    ("month_rare", {"month": "dec"}, "newest"),
+    ("month_rare", {"month": "dec"}, "score_high"),
+    ("job_min_score", {"job": "admin.", "min_score": 0.5}, "newest"),
+    ("score_range", {"min_score": 0.5, "max_score": 0.9}, "newest"),
+    ("score_range", {"min_score": 0.5, "max_score": 0.9}, "score_high"),
+    ("job_education", {"job": "admin.", "education": "university.degree"}, "newest"),
+    ("created_from", {"created_from": "recent"}, "newest"),
+    ("created_from", {"created_from": "recent"}, "oldest"),
+]
+
+def median_ms(fn, repeats: int) -> float:
+    runs = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    return round(float(np.median(runs)) * 1000, 2)
+
+def measure_ingest(rows: int, seed: int) -> dict:
+    from app import ingest
+    from app.database import SessionLocal
+    from benchmarks.synthetic import synthetic_csv
+    csv_bytes = synthetic_csv(rows, seed)
+    db = SessionLocal()
+    try:
+        result = ingest.ingest_csv(db, io.BytesIO(csv_bytes))
+    finally:
+        db.close()
+    return {
+        "rows": rows,
+        "rows_per_sec": round(rows / result["elapsed_seconds"], 1),
+        "insert_s": result["stage_seconds"].get("insert"),
+        "commit_s": result["stage_seconds"].get("commit"),
+    }
+
+def grow(target_rows: int):
+    """Gandakan baris leads yang ada sampai target_rows (tanpa model, jauh lebih cepat dari ingest)"""
+    from sqlalchemy import text
+    from app import models, stats
+    from app.database import engine, SessionLocal
+    columns = ", ".join(f'"{column.name}"' for column in models.Lead.__table__.columns
+                        if column.name not in ("id", "created_at", "updated_at"))
+    with engine.begin() as conn:
+        count = conn.execute(text("SELECT count(*) FROM leads")).scalar()
+        while count < target_rows:
+            batch = min(count, target_rows - count)
+            # created_at naik 1 detik per baris (urut id), jadi filter created_from "recent" mengenai ekor tabel
+            conn.execute(text(
+                f"INSERT INTO leads ({columns}, created_at) SELECT {columns}, datetime('now', '+' || (id + {count}) || ' seconds') "
+                f"FROM leads ORDER BY id LIMIT {batch}"
+            ))
+            count += batch
+    db = SessionLocal()
+    try:
+        stats.rebuild(db)
+    finally:
+        db.close()
+    return count
+
+def query_plan(db, run) -> str:
+    """Query plan SQLite dari SELECT pertama yang dijalankan run()"""
+    from sqlalchemy import event
+    statements = []
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        run()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    statement, parameters = statements[0]
+    rows = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+    return " | ".join(row[-1] for row in rows)
+
+def measure_reads(repeats: int) -> list:
+    from datetime import timedelta
+    from app import crud, models
+    from app.database import SessionLocal
+    db = SessionLocal()
+    Lead = models.Lead
+    # Jendela "recent": 1% lead terbaru
+    total = db.query(Lead).count()
+    recent = db.query(Lead.created_at).order_by(Lead.id.desc()).offset(total // 100).limit(1).scalar() - timedelta(seconds=1)
+
+    results = []
+    for name, filters, sort_by in CASES:
+        filters = {key: recent if value == "recent" else value for key, value in filters.items()}
+        page = lambda: crud.get_leads(db, limit=100, sort_by=sort_by, **filters)
+        leads = page()
+        cursor = crud.encode_cursor(leads[-1], sort_by) if leads else None
+        results.append({
+            "case": name,
+            "sort_by": sort_by,
+            "page_ms": median_ms(page, repeats),
+            "next_page_ms": median_ms(lambda: crud.get_leads(db, limit=100, sort_by=sort_by, after=cursor, **filters), repeats) if cursor else None,
+            "count_ms": median_ms(lambda: crud.count_leads(db, **filters), repeats),
+            "plan": query_plan(db, page),
+        })
+    db.close()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000000, help="Jumlah leads untuk benchmark baca")
+    parser.add_argument("--ingest-rows", type=int, default=100000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--drop-indexes", nargs="*", default=[], help="Index models.Lead yang tidak dibuat")
+    parser.add_argument("--output", default=None, help="Simpan hasil (JSON) ke file ini")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+    os.environ.setdefault("ML_LOAD_MODE", "eager")
+    from app import models
+    from app.database import engine
+    table = models.Lead.__table__
+    for index in list(table.indexes):
+        if index.name in args.drop_indexes:
+            table.indexes.remove(index)
+    models.Base.metadata.create_all(bind=engine)
+
+    ingest = measure_ingest(args.ingest_rows, args.seed)
+    print(f"ingest {ingest['rows']} rows: {ingest['rows_per_sec']} rows/s (insert {ingest['insert_s']}s, commit {ingest['commit_s']}s)")
+    rows = grow(args.rows)
+    reads = measure_reads(args.repeats)
+
+    print(f"\n{rows} leads, indexes: {', '.join(sorted(index.name for index in table.indexes))}")
+    print(f"{'case':>14} {'sort':>10} {'page ms':>8} {'next ms':>8} {'count ms':>9}  plan")
+    for r in reads:
+        print(f"{r['case']:>14} {r['sort_by']:>10} {r['page_ms']:>8} {str(r['next_page_ms']):>8} {r['count_ms']:>9}  {r['plan']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"rows": rows, "indexes": sorted(index.name for index in table.indexes),
+                       "ingest": ingest, "reads": reads}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark scoring satu-lead dari banyak thread bersamaan: predict per request
+(tanpa batching) vs micro-batcher, untuk beberapa max_wait_ms.
+Dicatat throughput (request/detik), latency p50/p99 dan rata-rata ukuran batch.
+
+Jalankan dari folder backend/:
+    python -m benchmarks.bench_microbatch --threads 1 8 32 --requests 2000
+    python -m benchmarks.bench_microbatch --target explain --requests 200
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+from app.ml_service import ml_service
+from app.microbatch import MicroBatcher
+
+LEAD = {
+    "age": 30, "job": "admin.", "marital": "married", "education": "university.degree",
+    "default": "no", "housing": "yes", "loan": "no", "contact": "cellular",
+    "month": "may", "day_of_week": "mon", "campaign": 1, "pdays": 999, "previous": 0,
+    "poutcome": "nonexistent", "emp_var_rate": -1.8, "cons_price_idx": 92.893,
+    "cons_conf_idx": -46.2, "euribor3m": 1.2, "nr_employed": 5099.1
+}
+
+def run(call, threads: int, n_requests: int):
+    latencies = []
+
+    def one(_):
+        start = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(one, range(n_requests)))
+    elapsed = time.perf_counter() - start
+
+    ms = np.array(latencies) * 1000
+    return n_requests / elapsed, np.percentile(ms, 50), np.percentile(ms, 99)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--target", choices=["predict", "explain"], default="predict")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, nargs="+", default=[1.0, 2.0, 5.0])
+    args = parser.parse_args()
+
+    ml_service.wait_until_ready()
+    if args.target == "predict":
+        batch_fn = ml_service.predict_encoded
+        single = lambda: ml_service.predict_encoded(ml_service.preprocess_input(LEAD))
+    else:
+        ml_service.get_explainer()
+        batch_fn = ml_service.explain_batch
+        single = lambda: ml_service.explain_batch(ml_service.preprocess_input(LEAD))
+
+    print(f"{'threads':>7} {'mode':>14} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'batch':>7}")
+    for threads in args.threads:
+        rps, p50, p99 = run(single, threads, args.requests)
+        print(f"{threads:>7} {'no batching':>14} {rps:>10.1f} {p50:>9.2f} {p99:>9.2f} {1:>7.1f}")
+
+        for wait_ms in args.max_wait_ms:
+            batcher = MicroBatcher(batch_fn, args.max_batch_size, wait_ms)
+            call = lambda: batcher.submit(ml_service.preprocess_input(LEAD)[0]).result()
+            rps, p50, p99 = run(call, threads, args.requests)
+            mode = f"wait {wait_ms:g}ms"
+            print(f"{threads:>7} {mode:>14} {rps:>10.1f} {p50:>9.2f} {p99:>9.2f} {batcher.mean_batch_size():>7.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Benchmark mode serving: memori per proses dan throughput
+  single       1 proses uvicorn (perilaku lama)
+  prefork      gunicorn -c gunicorn.conf.py, model dimuat sekali di master lalu di-fork (copy-on-write)
+  no-preload   gunicorn tanpa preload: tiap worker memuat model & explainer sendiri (pembanding)
+
+Memori dibaca dari /proc/<pid>/smaps_rollup (Linux): RSS ikut menghitung halaman yang dipakai
+bersama, PSS membagi halaman bersama rata ke semua proses (jumlah PSS = memori fisik sebenarnya),
+USS = halaman milik proses itu sendiri saja.
+
+Jalankan dari folder backend/:
+    python -m benchmarks.bench_prefork --workers 2
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import httpx
+import numpy as np
+
+from benchmarks.bench_async_api import free_port, upload, wait_ready
+from benchmarks.synthetic import synthetic_csv
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def server_command(name: str, port: int, workers: int) -> tuple:
+    if name == "single":
+        return [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)], {}
+    env = {"WEB_CONCURRENCY": str(workers), "PORT": str(port), "GUNICORN_PRELOAD": "true" if name == "prefork" else "false"}
+    return [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:app"], env
+
+def memory_kb(pid: int) -> dict:
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss_mb": round(values["Rss"] / 1024, 1),
+        "pss_mb": round(values["Pss"] / 1024, 1),
+        "uss_mb": round((values["Private_Clean"] + values["Private_Dirty"]) / 1024, 1),
+    }
+
+def process_tree(pid: int) -> list:
+    """pid + semua anaknya (worker gunicorn)"""
+    children = subprocess.run(["pgrep", "-P", str(pid)], capture_output=True, text=True).stdout.split()
+    return [pid] + [int(child) for child in children]
+
+def load_test(base_url: str, clients: int, seconds: float, max_id: int, seed: int) -> dict:
+    latencies = {"leads_page": [], "lead_detail": []}
+    errors = []
+    deadline = time.monotonic() + seconds
+
+    def client_loop(i: int):
+        rng = np.random.default_rng(seed + i)
+        with httpx.Client(base_url=base_url, timeout=60) as client:
+            while time.monotonic() < deadline:
+                for name, url, params in (
+                    ("leads_page", "/api/v1/leads", {"limit": 100, "sort_by": "score_high"}),
+                    ("lead_detail", f"/api/v1/leads/{int(rng.integers(1, max_id + 1))}", None),
+                ):
+                    start = time.perf_counter()
+                    try:
+                        client.get(url, params=params).raise_for_status()
+                    except httpx.HTTPError as e:
+                        errors.append(str(e))
+                    latencies[name].append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client_loop, args=(i,)) for i in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    summary = {"req_per_sec": round(sum(len(v) for v in latencies.values()) / elapsed, 1), "errors": len(errors)}
+    for name, values in latencies.items():
+        ms = np.array(values) * 1000
+        summary[f"{name}_p50_ms"] = round(float(np.percentile(ms, 50)), 2)
+        summary[f"{name}_p99_ms"] = round(float(np.percentile(ms, 99)), 2)
+    return summary
+
+def run_config(name: str, args, csv_bytes: bytes) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        command, extra_env = server_command(name, port, args.workers)
+        env = {
+            **os.environ, **extra_env,
+            "ML_LOAD_MODE": "eager",
+            "UPLOAD_DIR": tmp,
+            "DATABASE_URL": f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+        }
+        start = time.perf_counter()
+        server = subprocess.Popen(command, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_ready(base_url)
+            ready_seconds = time.perf_counter() - start
+            max_id = upload(base_url, csv_bytes)["sample_data"][0]["id"] + args.rows - 1
+            time.sleep(2) # Semua worker selesai startup
+            idle_memory = [memory_kb(pid) for pid in process_tree(server.pid)]
+
+            result = load_test(base_url, args.clients, args.seconds, max_id, args.seed)
+            processes = process_tree(server.pid)
+            memory = [memory_kb(pid) for pid in processes]
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+    return {
+        "config": name,
+        "processes": len(processes),
+        "ready_seconds": round(ready_seconds, 2),
+        "idle_total_pss_mb": round(sum(m["pss_mb"] for m in idle_memory), 1),
+        "total_pss_mb": round(sum(m["pss_mb"] for m in memory), 1),
+        "memory": memory,
+        **result,
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--configs", nargs="+", default=["single", "prefork", "no-preload"], choices=["single", "prefork", "no-preload"])
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=15.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="Simpan hasil (JSON) ke file ini")
+    args = parser.parse_args()
+
+    csv_bytes = synthetic_csv(args.rows, args.seed)
+    results = [run_config(name, args, csv_bytes) for name in args.configs]
+
+    print(f"{'config':>11} {'procs':>5} {'ready s':>8} {'PSS idle':>9} {'PSS load':>9} {'req/s':>7} {'page p99':>9} {'detail p99':>10} {'errors':>6}")
+    for r in results:
+        print(f"{r['config']:>11} {r['processes']:>5} {r['ready_seconds']:>8} {r['idle_total_pss_mb']:>9} {r['total_pss_mb']:>9} "
+              f"{r['req_per_sec']:>7} {r['leads_page_p99_ms']:>9} {r['lead_detail_p99_ms']:>10} {r['errors']:>6}")
+        for pid_memory in r["memory"]:
+            print(f"{'':>11}   RSS {pid_memory['rss_mb']:>7} MB  PSS {pid_memory['pss_mb']:>7} MB  USS {pid_memory['uss_mb']:>7} MB")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
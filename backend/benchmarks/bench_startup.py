@@ -0,0 +1,75 @@
+"""
+Benchmark cold start: waktu import app.main, request pertama ke "/", waktu sampai
+/api/v1/ready = 200, dan latency penjelasan SHAP pertama, untuk tiap ML_LOAD_MODE.
+Setiap pengukuran jalan di proses Python baru (benar-benar cold) dengan DB kosong.
+
+Jalankan dari folder backend/:
+    python -m benchmarks.bench_startup --modes eager background
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import json, time
+t0 = time.perf_counter()
+import app.main
+from fastapi.testclient import TestClient
+t_import = time.perf_counter() - t0
+
+with TestClient(app.main.app) as client:
+    t1 = time.perf_counter()
+    client.get("/")
+    t_first = time.perf_counter() - t1
+
+    while client.get("/api/v1/ready").status_code != 200:
+        time.sleep(0.01)
+    t_ready = time.perf_counter() - t0
+
+    from app.test_model import dummy_data
+    t2 = time.perf_counter()
+    app.main.ml_service.predict(dummy_data)
+    t_predict = time.perf_counter() - t2
+
+    t3 = time.perf_counter()
+    app.main.ml_service.explain_prediction(dummy_data)
+    t_explain = time.perf_counter() - t3
+
+print("RESULT " + json.dumps({
+    "import_s": t_import,
+    "first_request_s": t_first,
+    "ready_s": t_ready,
+    "first_predict_s": t_predict,
+    "first_explain_s": t_explain,
+}))
+"""
+
+def measure(mode: str):
+    env = dict(os.environ, ML_LOAD_MODE=mode, PYTHONPATH=BACKEND_DIR)
+    with tempfile.TemporaryDirectory() as tmp:
+        # cwd sementara supaya sqlite:///./crm.db yang dibuat adalah DB kosong, bukan DB asli
+        out = subprocess.run([sys.executable, "-c", CHILD], cwd=tmp, env=env, capture_output=True, text=True, check=True)
+    line = next(l for l in out.stdout.splitlines() if l.startswith("RESULT "))
+    return json.loads(line[len("RESULT "):])
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modes", nargs="+", default=["eager", "background"])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    columns = ["import_s", "first_request_s", "ready_s", "first_predict_s", "first_explain_s"]
+    print(f"{'mode':>12} " + " ".join(f"{c:>16}" for c in columns))
+    for mode in args.modes:
+        runs = [measure(mode) for _ in range(args.repeat)]
+        # Median supaya tidak terpengaruh satu run yang kebetulan lambat
+        median = {c: sorted(r[c] for r in runs)[len(runs) // 2] for c in columns}
+        print(f"{mode:>12} " + " ".join(f"{median[c] * 1000:>13.1f} ms" for c in columns))
+
+if __name__ == "__main__":
+    main()
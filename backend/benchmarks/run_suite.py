@@ -0,0 +1,220 @@
+"""
+Benchmark suite hot path API dengan data sintetis (benchmarks/synthetic.py) dan seed tetap,
+hasilnya disimpan sebagai JSON supaya bisa dibandingkan antar commit:
+  upload        POST /api/v1/upload-csv untuk tiap --sizes (DB kosong & proses baru per ukuran)
+  leads_page    GET /api/v1/leads?limit=100 untuk tiap sort_by
+  dashboard     GET /api/v1/dashboard/stats
+  lead_detail   GET /api/v1/leads/{id}: shap_cold (SHAP dihitung) & cached (penjelasan sudah tersimpan)
+  startup       cold start proses baru (lihat benchmarks/bench_startup.py)
+Latency baca diukur di DB hasil upload terbesar.
+
+Jalankan dari folder backend/:
+    python -m benchmarks.run_suite                        # -> benchmarks/results/<git sha>.json
+    python -m benchmarks.run_suite --sizes 1000 10000 --repeats 50 --output /tmp/quick.json
+    python -m benchmarks.run_suite --compare benchmarks/results/abc1234.json benchmarks/results/def5678.json
+
+PERHATIAN: dengan --database-url non-SQLite, semua tabel di database itu dihapus & dibuat ulang.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(BACKEND_DIR, "benchmarks", "results")
+
+# Setting yang ikut dicatat di metadata hasil (mempengaruhi angka)
+RECORDED_ENV = ["ML_LOAD_MODE", "CPU_POOL_WORKERS", "ASYNC_DB_ENABLED", "DASHBOARD_STATS_ENGINE",
+                "SQLITE_JOURNAL_MODE", "SQLITE_SYNCHRONOUS", "INGEST_CHUNK_SIZE", "PREDICTION_CACHE_SIZE"]
+
+def latency_summary(seconds: list) -> dict:
+    ms = np.array(seconds) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(ms, 50)), 2),
+        "p99_ms": round(float(np.percentile(ms, 99)), 2),
+        "mean_ms": round(float(ms.mean()), 2),
+    }
+
+def timed_get(client, url: str, params: dict = None) -> float:
+    start = time.perf_counter()
+    client.get(url, params=params).raise_for_status()
+    return time.perf_counter() - start
+
+# --- Dijalankan di proses anak (DB & proses baru per ukuran upload) ---
+def measure_reads(client, args) -> dict:
+    from app import crud
+    metrics = {}
+
+    for sort_by in crud.LEAD_SORTS:
+        params = {"limit": 100, "sort_by": sort_by}
+        timed_get(client, "/api/v1/leads", params) # Warm-up
+        runs = [timed_get(client, "/api/v1/leads", params) for _ in range(args.repeats)]
+        for key, value in latency_summary(runs).items():
+            metrics[f"leads_page.{sort_by}.{key}"] = value
+
+    timed_get(client, "/api/v1/dashboard/stats")
+    runs = [timed_get(client, "/api/v1/dashboard/stats") for _ in range(args.repeats)]
+    for key, value in latency_summary(runs).items():
+        metrics[f"dashboard_stats.{key}"] = value
+
+    # Lead acak (seed tetap): request pertama menghitung SHAP & menyimpannya, request kedua ambil dari DB
+    max_id = client.get("/api/v1/leads", params={"limit": 1}).json()[0]["id"]
+    rng = np.random.default_rng(args.seed)
+    lead_ids = rng.choice(np.arange(1, max_id + 1), size=min(args.detail_samples, max_id), replace=False)
+    cold = [timed_get(client, f"/api/v1/leads/{lead_id}") for lead_id in lead_ids]
+    cached = [timed_get(client, f"/api/v1/leads/{lead_id}") for lead_id in lead_ids]
+    for phase, runs in (("shap_cold", cold), ("cached", cached)):
+        for key, value in latency_summary(runs).items():
+            metrics[f"lead_detail.{phase}.{key}"] = value
+    return metrics
+
+def child(args):
+    from app import models
+    from app.database import engine
+    from benchmarks.synthetic import synthetic_csv
+    if engine.dialect.name != "sqlite":
+        models.Base.metadata.drop_all(bind=engine)
+    import app.main
+    from fastapi.testclient import TestClient
+
+    # Seed per ukuran, jadi CSV 1k bukan potongan awal CSV 100k
+    csv_bytes = synthetic_csv(args.rows, args.seed + args.rows)
+    with TestClient(app.main.app) as client:
+        while client.get("/api/v1/ready").status_code != 200:
+            time.sleep(0.05)
+
+        start = time.perf_counter()
+        response = client.post("/api/v1/upload-csv", files={"file": ("bench.csv", csv_bytes)})
+        seconds = time.perf_counter() - start
+        response.raise_for_status()
+        metrics = {
+            f"upload.{args.rows}.seconds": round(seconds, 3),
+            f"upload.{args.rows}.rows_per_sec": round(args.rows / seconds, 1),
+        }
+        if args.reads:
+            metrics.update(measure_reads(client, args))
+    print("RESULT " + json.dumps(metrics))
+
+def run_child(rows: int, reads: bool, args) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "PYTHONPATH": BACKEND_DIR,
+            "ML_LOAD_MODE": os.getenv("ML_LOAD_MODE", "eager"),
+            "UPLOAD_DIR": tmp,
+            "DATABASE_URL": args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+        }
+        command = [sys.executable, "-m", "benchmarks.run_suite", "--child", "--rows", str(rows),
+                   "--seed", str(args.seed), "--repeats", str(args.repeats), "--detail-samples", str(args.detail_samples)]
+        if reads:
+            command.append("--reads")
+        output = subprocess.run(command, cwd=tmp, env=env, capture_output=True, text=True)
+    lines = [line for line in output.stdout.splitlines() if line.startswith("RESULT ")]
+    if output.returncode != 0 or not lines:
+        raise RuntimeError(f"Benchmark child ({rows} rows) failed:\n{output.stderr[-2000:]}")
+    return json.loads(lines[-1][len("RESULT "):])
+
+# --- Proses utama ---
+def git_revision() -> str:
+    def git(*command):
+        return subprocess.run(["git", *command], cwd=BACKEND_DIR, capture_output=True, text=True).stdout.strip()
+    sha = git("rev-parse", "--short", "HEAD") or "unknown"
+    # Perubahan yang belum di-commit ditandai, supaya tidak tertukar dengan hasil commit aslinya
+    return f"{sha}-dirty" if git("status", "--porcelain", "--untracked-files=no") else sha
+
+def metadata(args) -> dict:
+    import sqlalchemy
+    import xgboost
+    database_url = args.database_url or "sqlite"
+    return {
+        "git": git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "xgboost": xgboost.__version__,
+        "sqlalchemy": sqlalchemy.__version__,
+        "database": database_url.split(":", 1)[0],
+        "seed": args.seed,
+        "sizes": args.sizes,
+        "repeats": args.repeats,
+        "detail_samples": args.detail_samples,
+        "env": {name: os.environ[name] for name in RECORDED_ENV if name in os.environ},
+    }
+
+def run_suite(args) -> dict:
+    from benchmarks.bench_startup import measure
+
+    metrics = {}
+    sizes = sorted(args.sizes)
+    for rows in sizes:
+        print(f"🔄 upload {rows} rows{' + reads' if rows == sizes[-1] else ''}...")
+        metrics.update(run_child(rows, rows == sizes[-1], args))
+
+    print(f"🔄 cold startup x{args.startup_repeats}...")
+    mode = os.getenv("ML_LOAD_MODE", "eager")
+    runs = [measure(mode) for _ in range(args.startup_repeats)]
+    for column in ("import_s", "ready_s", "first_explain_s"):
+        # Median supaya tidak terpengaruh satu run yang kebetulan lambat
+        metrics[f"startup.{column}"] = round(sorted(run[column] for run in runs)[len(runs) // 2], 3)
+
+    return {"meta": metadata(args), "metrics": metrics}
+
+def lower_is_better(metric: str) -> bool:
+    return not metric.endswith("rows_per_sec")
+
+def compare(path_a: str, path_b: str):
+    with open(path_a) as f:
+        a = json.load(f)
+    with open(path_b) as f:
+        b = json.load(f)
+    print(f"A = {a['meta']['git']} ({a['meta']['timestamp']}), B = {b['meta']['git']} ({b['meta']['timestamp']})")
+    print(f"{'metric':>40} {'A':>12} {'B':>12} {'delta':>9}")
+    for metric in a["metrics"]:
+        if metric not in b["metrics"]:
+            continue
+        before, after = a["metrics"][metric], b["metrics"][metric]
+        change = (after - before) / before * 100 if before else 0.0
+        # ✅ lebih baik / ⚠️ lebih buruk (lebih dari 5%)
+        better = change < 0 if lower_is_better(metric) else change > 0
+        flag = "" if abs(change) < 5 else "✅" if better else "⚠️"
+        print(f"{metric:>40} {before:>12} {after:>12} {change:>+8.1f}% {flag}")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000, 10000, 100000])
+    parser.add_argument("--repeats", type=int, default=200, help="Request per endpoint baca")
+    parser.add_argument("--detail-samples", type=int, default=50, help="Jumlah lead untuk detail + SHAP")
+    parser.add_argument("--startup-repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", default=None, help="Default: SQLite sementara per ukuran upload")
+    parser.add_argument("--output", default=None, help="Default: benchmarks/results/<git sha>.json")
+    parser.add_argument("--compare", nargs=2, metavar=("A", "B"), help="Bandingkan dua file hasil")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--rows", type=int, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--reads", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.compare:
+        return compare(*args.compare)
+    if args.child:
+        return child(args)
+
+    result = run_suite(args)
+    output = args.output or os.path.join(RESULTS_DIR, f"{result['meta']['git']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+
+    for metric, value in result["metrics"].items():
+        print(f"{metric:>40} {value:>12}")
+    print(f"✅ Results saved to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Generator lead sintetis ala dataset UCI bank-additional (kolom & format CSV sama seperti upload asli).
+Kategori diambil dari kosakata model_features.json (+ kategori baseline yang di-drop saat training),
+dengan proporsi kira-kira seperti dataset aslinya. Seed yang sama = CSV yang sama persis.
+
+Jalankan dari folder backend/:
+    python -m benchmarks.synthetic --rows 100000 --seed 42 --output leads_100k.csv
+"""
+import argparse
+import json
+import os
+import numpy as np
+import pandas as pd
+
+from app.feature_encoder import FeatureEncoder
+
+# Path yang sama dengan ml_service.FEATURES_PATH (tanpa import ml_service, yang langsung memuat model)
+FEATURES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ml_assets", "model_features.json")
+
+# Kategori yang di-drop (drop_first) saat training, tidak muncul di model_features.json
+BASELINE_CATEGORIES = {
+    "job": "admin.", "marital": "divorced", "education": "basic.4y", "default": "no",
+    "housing": "no", "loan": "no", "contact": "cellular", "month": "apr",
+    "day_of_week": "fri", "poutcome": "failure",
+}
+
+# Perkiraan frekuensi di bank-additional-full (41k baris). Nilai yang tidak ada di sini dapat bobot 1%.
+CATEGORY_WEIGHTS = {
+    "job": {"admin.": 25.3, "blue-collar": 22.5, "technician": 16.4, "services": 9.6, "management": 7.1,
+            "retired": 4.2, "entrepreneur": 3.5, "self-employed": 3.5, "housemaid": 2.6, "unemployed": 2.5,
+            "student": 2.1},
+    "marital": {"married": 60.5, "single": 28.1, "divorced": 11.2},
+    "education": {"university.degree": 29.5, "high.school": 23.1, "basic.9y": 14.7, "professional.course": 12.7,
+                  "basic.4y": 10.1, "basic.6y": 5.6, "illiterate": 0.1},
+    "default": {"no": 79.1, "yes": 0.1},
+    "housing": {"yes": 52.4, "no": 45.2},
+    "loan": {"no": 82.4, "yes": 15.2},
+    "contact": {"cellular": 63.5, "telephone": 36.5},
+    "month": {"may": 33.4, "jul": 17.4, "aug": 15.0, "jun": 12.9, "nov": 10.0, "apr": 6.4,
+              "oct": 1.7, "sep": 1.4, "mar": 1.3, "dec": 0.4},
+    "day_of_week": {"thu": 20.9, "mon": 20.7, "wed": 19.7, "tue": 19.6, "fri": 19.0},
+}
+
+# Indikator ekonomi di dataset asli berubah per bulan kampanye, bukan per nasabah:
+# month -> daftar (emp.var.rate, cons.price.idx, cons.conf.idx, euribor3m, nr.employed)
+MACRO_BY_MONTH = {
+    "mar": [(-1.8, 92.843, -50.0, 1.531, 5099.1)],
+    "apr": [(-1.8, 93.075, -47.1, 1.405, 5099.1)],
+    "may": [(1.1, 93.994, -36.4, 4.857, 5191.0), (-1.8, 92.893, -46.2, 1.299, 5099.1)],
+    "jun": [(1.4, 94.465, -41.8, 4.961, 5228.1), (-2.9, 92.963, -40.8, 1.260, 5076.2)],
+    "jul": [(1.4, 93.918, -42.7, 4.962, 5228.1)],
+    "aug": [(1.4, 93.444, -36.1, 4.964, 5228.1), (-2.9, 92.201, -31.4, 0.869, 5076.2)],
+    "sep": [(-3.4, 92.379, -29.8, 0.788, 5017.5)],
+    "oct": [(-3.4, 92.431, -26.9, 0.754, 5017.5)],
+    "nov": [(-0.1, 93.200, -42.0, 4.076, 5195.8), (-3.4, 92.649, -30.1, 0.722, 5017.5)],
+    "dec": [(-3.0, 92.713, -33.0, 0.715, 5023.5)],
+}
+MACRO_COLUMNS = ["emp.var.rate", "cons.price.idx", "cons.conf.idx", "euribor3m", "nr.employed"]
+
+def vocabularies(features_path: str = FEATURES_PATH) -> dict:
+    """Kolom kategorikal -> daftar nilai (dari manifest fitur model + kategori baseline)"""
+    with open(features_path) as f:
+        encoder = FeatureEncoder(json.load(f))
+    vocab = {}
+    for column, values in encoder.category_index.items():
+        vocab[column] = sorted(set(values) | {BASELINE_CATEGORIES[column]})
+    return vocab
+
+def choose(rng: np.random.Generator, values: list, weights: dict, n: int) -> np.ndarray:
+    p = np.array([weights.get(value, 1.0) for value in values])
+    return rng.choice(np.array(values, dtype=object), size=n, p=p / p.sum())
+
+def generate_leads(n_rows: int, seed: int = 42, features_path: str = FEATURES_PATH) -> pd.DataFrame:
+    """DataFrame lead dengan nama kolom CSV asli (mis. 'emp.var.rate')"""
+    rng = np.random.default_rng(seed)
+    vocab = vocabularies(features_path)
+    df = pd.DataFrame(index=range(n_rows))
+
+    df["age"] = np.clip(rng.normal(40, 10.4, n_rows), 17, 98).astype(int)
+    for column in ("job", "marital", "education", "default", "housing", "loan", "contact", "month", "day_of_week"):
+        if column in vocab:
+            df[column] = choose(rng, vocab[column], CATEGORY_WEIGHTS.get(column, {}), n_rows)
+    df["campaign"] = np.clip(rng.geometric(0.4, n_rows), 1, 56)
+
+    # Riwayat kampanye sebelumnya: mayoritas belum pernah dihubungi (pdays 999, poutcome nonexistent)
+    previous = rng.choice([0, 1, 2, 3, 4], size=n_rows, p=[0.863, 0.111, 0.018, 0.005, 0.003])
+    contacted = (previous > 0) & (rng.random(n_rows) < 0.33)
+    df["pdays"] = np.where(contacted, rng.integers(0, 28, n_rows), 999)
+    df["previous"] = previous
+    df["poutcome"] = np.where(previous == 0, "nonexistent", np.where(contacted, "success", "failure"))
+
+    # Indikator ekonomi mengikuti bulan kampanye, euribor sedikit bergeser per hari
+    macro = np.empty((n_rows, len(MACRO_COLUMNS)))
+    months = df["month"].to_numpy() if "month" in df else np.full(n_rows, "may", dtype=object)
+    for month, regimes in MACRO_BY_MONTH.items():
+        rows = np.flatnonzero(months == month)
+        picked = rng.integers(0, len(regimes), len(rows))
+        macro[rows] = np.array(regimes)[picked]
+    macro[:, 3] = np.round(macro[:, 3] + rng.normal(0, 0.01, n_rows), 3)
+    for i, column in enumerate(MACRO_COLUMNS):
+        df[column] = macro[:, i]
+
+    return df
+
+def synthetic_csv(n_rows: int, seed: int = 42, sep: str = ";") -> bytes:
+    """CSV siap upload (default sep ';' seperti bank-additional-full.csv)"""
+    return generate_leads(n_rows, seed).to_csv(sep=sep, index=False).encode()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--sep", default=";")
+    parser.add_argument("--output", required=True)
+    args = parser.parse_args()
+    with open(args.output, "wb") as f:
+        f.write(synthetic_csv(args.rows, args.seed, args.sep))
+    print(f"✅ {args.rows} leads written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Mode pre-fork multi-worker (Linux / macOS). Jalankan dari folder backend/:
+    gunicorn -c gunicorn.conf.py app.main:app
+
+App (termasuk MLService: model XGBoost + TreeExplainer) dimuat SEKALI di proses master
+(preload_app), lalu di-fork ke tiap worker. Memori model dipakai bersama secara copy-on-write,
+jadi N worker tidak berarti N kali unpickle model & N kali memori model.
+Cache prediksi, CPU pool dan /metrics tetap per worker.
+
+Setting (env):
+  WEB_CONCURRENCY   jumlah worker (default: jumlah core yang boleh dipakai proses ini)
+  XGB_NTHREAD       thread XGBoost per worker (default: core / worker, minimal 1),
+                    supaya worker x thread tidak melebihi jumlah core
+  PORT              port (default 8000)
+  GUNICORN_PRELOAD  false = tiap worker memuat app & model sendiri (hanya untuk pembanding / debug)
+  ML_LOAD_MODE      default eager di mode ini (lihat bawah); nilai yang di-set operator tidak ditimpa
+  ML_REGISTRY_POLL_SECONDS
+                    default 5 kalau worker > 1: promote / shadow / reload hanya mengganti model di worker
+                    yang menerima request (dan menulis registry.json), worker lain menyusul lewat polling ini
+
+Trade-off cold start: dengan preload + eager, master memuat model SEBELUM port dibuka, jadi
+health check gagal sampai model selesai dimuat (mode uvicorn + ML_LOAD_MODE=background langsung
+bisa jawab request, status model di /api/v1/ready). Karena itu mode ini opt-in (Dockerfile: PREFORK=true).
+"""
+import gc
+import os
+
+cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+
+workers = int(os.getenv("WEB_CONCURRENCY", cores))
+xgb_threads = int(os.getenv("XGB_NTHREAD", 0)) or max(1, cores // workers)
+
+# Dibaca ml_service saat app di-import (preload di bawah), jadi harus di-set sebelum itu
+os.environ["XGB_NTHREAD"] = str(xgb_threads)
+os.environ.setdefault("OMP_NUM_THREADS", str(xgb_threads))
+# Model harus sudah dimuat di master sebelum fork supaya bisa dipakai bersama. Mode background akan
+# memuat model di thread per worker (thread tidak ikut ter-fork), sama saja dengan tanpa preload.
+os.environ.setdefault("ML_LOAD_MODE", "eager")
+# Tiap worker punya salinan model sendiri setelah fork, jadi perubahan registry harus dipantau tiap worker
+if workers > 1:
+    os.environ.setdefault("ML_REGISTRY_POLL_SECONDS", "5")
+
+bind = f"0.0.0.0:{os.getenv('PORT', 8000)}"
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+# Upload CSV sinkron yang besar bisa lama
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 300))
+graceful_timeout = 30
+
+def when_ready(server):
+    """Di master, setelah app dimuat (preload) dan sebelum worker pertama di-fork"""
+    from app.database import engine
+    from app.cpu_pool import cpu_pool
+
+    # Koneksi DB yang dibuka saat import (create_all, migrasi kolom) tidak boleh dipakai bersama proses anak
+    engine.dispose()
+    # Objek yang sudah ada (model, encoder, modul) dipindah ke generasi permanen: GC di worker tidak
+    # menyentuh (menulis header) objek-objek ini, jadi halaman memorinya tetap dipakai bersama
+    gc.collect()
+    gc.freeze()
+
+    if workers * xgb_threads > cores:
+        server.log.warning(f"⚠️ {workers} workers x {xgb_threads} XGBoost threads > {cores} cores (oversubscribed)")
+    if preload_app and os.environ["ML_LOAD_MODE"] != "eager":
+        server.log.warning(f"⚠️ ML_LOAD_MODE={os.environ['ML_LOAD_MODE']}: every worker loads its own model (not shared)")
+    if workers > 1 and float(os.environ["ML_REGISTRY_POLL_SECONDS"]) <= 0:
+        server.log.warning("⚠️ ML_REGISTRY_POLL_SECONDS=0: model promote/shadow/reload only applies to the worker that served it")
+    if cpu_pool.enabled:
+        server.log.warning("⚠️ CPU_POOL_WORKERS > 0: every worker spawns its own pool with its own model copy")
+    server.log.info(f"✅ Forking {workers} workers x {xgb_threads} XGBoost threads (preload={preload_app})")
+
+def post_fork(server, worker):
+    # Resume job & backfill saat startup cukup di satu worker (worker pertama, age 1)
+    os.environ["STARTUP_TASKS"] = "true" if worker.age == 1 else "false"
@@ -0,0 +1,6 @@
+import os
+import tempfile
+
+# Sebelum app di-import: test tidak boleh menyentuh crm.db, dan model tidak dimuat saat import
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}")
+os.environ.setdefault("ML_LOAD_MODE", "background")
@@ -0,0 +1,23 @@
+from app import auth, main
+
+ADMIN_ROUTES = [
+    ("DELETE", "/api/v1/cache"),
+    ("POST", "/api/v1/models/reload"),
+    ("POST", "/api/v1/models/{name}/promote"),
+    ("POST", "/api/v1/models/{name}/shadow"),
+    ("DELETE", "/api/v1/models/shadow"),
+    ("POST", "/api/v1/dashboard/stats/rebuild"),
+]
+
+def route_dependencies(method, path):
+    for route in main.app.routes:
+        if getattr(route, "path", None) == path and method in route.methods:
+            return [dependency.call for dependency in route.dependant.dependencies]
+    raise AssertionError(f"{method} {path} not found")
+
+def test_admin_routes_always_require_login():
+    # AUTH_REQUIRED default false: route baca / ingest terbuka, route admin tetap butuh token
+    assert not auth.AUTH_REQUIRED
+    for method, path in ADMIN_ROUTES:
+        assert auth.get_current_user in route_dependencies(method, path), (method, path)
+    assert auth.get_current_user not in route_dependencies("GET", "/api/v1/leads")
@@ -0,0 +1,11 @@
+import asyncio
+
+from app import auth, schemas
+
+def test_optional_login_returns_user_id_for_valid_token(monkeypatch):
+    monkeypatch.setattr(auth, "load_user", lambda username: schemas.CurrentUser(id=7, username=username, is_active=True))
+    token = auth.create_access_token({"sub": "budi"})
+
+    assert asyncio.run(auth.get_current_user_id(token)) == 7
+    assert asyncio.run(auth.get_current_user_id(None)) is None
+    assert asyncio.run(auth.get_current_user_id("not-a-jwt")) is None
@@ -0,0 +1,22 @@
+import operator
+import os
+import signal
+
+from app.cpu_pool import CpuPool
+
+def test_run_recovers_after_worker_is_killed():
+    pool = CpuPool(2)
+    try:
+        assert pool.run(operator.add, 1, 2) == 3
+        broken = pool.executor
+        processes = list(broken._processes.values())
+        for process in processes:
+            os.kill(process.pid, signal.SIGKILL)
+        for process in processes:
+            process.join()
+
+        assert pool.run(operator.add, 2, 3) == 5
+        assert pool.executor is not broken
+        assert pool.run(operator.mul, 2, 3) == 6
+    finally:
+        pool.shutdown()
@@ -0,0 +1,14 @@
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app import crud
+
+def test_copy_only_with_psycopg3(monkeypatch):
+    monkeypatch.setattr(crud, "PG_BULK_INSERT", "copy")
+    assert crud.copy_supported(postgresql.psycopg.dialect())
+    assert not crud.copy_supported(postgresql.psycopg2.dialect())
+    assert not crud.copy_supported(postgresql.asyncpg.dialect())
+    assert not crud.copy_supported(sqlite.pysqlite.dialect())
+
+def test_copy_disabled_by_setting(monkeypatch):
+    monkeypatch.setattr(crud, "PG_BULK_INSERT", "executemany")
+    assert not crud.copy_supported(postgresql.psycopg.dialect())
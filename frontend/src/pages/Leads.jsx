@@ -14,6 +14,7 @@ const Leads = () => {
   const [page, setPage] = useState(0); 
   const [totalCount, setTotalCount] = useState(0); // State untuk total data
   const [sortOption, setSortOption] = useState('newest'); // State untuk sorting
+  const [labelFilter, setLabelFilter] = useState(''); // Filter label (diproses di server)
 
   const toast = useToast();
   const fileInputRef = useRef(null); 
@@ -23,14 +24,13 @@ const Leads = () => {
   const fetchLeads = async () => {
     setLoading(true);
     try {
-      // Kita panggil 2 API sekaligus: Data Leads & Statistik (untuk dapat total count)
-      const [leadsResponse, statsResponse] = await Promise.all([
-        api.get(`/leads?skip=${page * limit}&limit=${limit}&sort_by=${sortOption}`),
-        api.get('/dashboard/stats') // Kita "pinjam" endpoint ini untuk tau total data
-      ]);
+      // Filter & total count dari server (header X-Total-Count), tidak perlu pinjam dashboard/stats
+      const params = { skip: page * limit, limit, sort_by: sortOption };
+      if (labelFilter) params.label = labelFilter;
+      const leadsResponse = await api.get('/leads', { params });
 
       setLeads(leadsResponse.data);
-      setTotalCount(statsResponse.data.total_leads); // Simpan total data
+      setTotalCount(Number(leadsResponse.headers['x-total-count'] || 0)); // Simpan total data
 
     } catch (error) {
       toast({
@@ -45,10 +45,10 @@ const Leads = () => {
     }
   };
 
-  // Reload saat page ATAU sortOption berubah
+  // Reload saat page, sortOption ATAU filter berubah
   useEffect(() => {
     fetchLeads();
-  }, [page, sortOption]); 
+  }, [page, sortOption, labelFilter]); 
 
   const handleFileUpload = async (event) => {
     const file = event.target.files[0];
@@ -96,6 +96,24 @@ const Leads = () => {
         
         <Spacer />
         
+        {/* --- FILTER LABEL --- */}
+        <Select 
+          w={{ base: "full", md: "200px" }} 
+          bg="gray.800" 
+          color="white" 
+          borderColor="gray.600"
+          value={labelFilter}
+          onChange={(e) => {
+            setLabelFilter(e.target.value);
+            setPage(0); // Reset ke halaman 1 setiap ganti filter
+          }}
+        >
+          <option value="">All Labels</option>
+          <option value="High Potential">High Potential</option>
+          <option value="Medium Potential">Medium Potential</option>
+          <option value="Low Potential">Low Potential</option>
+        </Select>
+
         {/* --- FITUR SORTING (BARU) --- */}
         <Select 
           w={{ base: "full", md: "200px" }} 